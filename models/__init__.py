@@ -13,8 +13,10 @@ from .database import (
     PhotoHash,
     Duplicate,
     PhotoState,
+    PROCESSING_STATES,
     get_engine,
     get_session,
+    count_photos_by_state,
     init_db,
     drop_all_tables
 )
@@ -46,9 +48,11 @@ __all__ = [
     "PhotoHash",
     "Duplicate",
     "PhotoState",
+    "PROCESSING_STATES",
     # Database functions
     "get_engine",
     "get_session",
+    "count_photos_by_state",
     "init_db",
     "drop_all_tables",
     # Pydantic schemas
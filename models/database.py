@@ -2,17 +2,22 @@
 SQLAlchemy ORM models for AI Photos Management system.
 """
 
+import os
+import weakref
 from datetime import datetime
-from typing import List, Optional
+from functools import lru_cache
+from typing import Dict, List, Optional
 from sqlalchemy import (
-    create_engine, Column, Integer, String, Float, DateTime,
-    ForeignKey, Text, JSON, Index, BigInteger, Enum as SQLEnum,
-    UniqueConstraint
+    create_engine, Column, Integer, SmallInteger, String, Float, DateTime,
+    ForeignKey, Text, Index, BigInteger, LargeBinary, UniqueConstraint,
+    func, select, text
 )
+from sqlalchemy.types import TypeDecorator
 from sqlalchemy.orm import declarative_base, relationship, Session
 from sqlalchemy.dialects.postgresql import TSVECTOR
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import HALFVEC
 import enum
+import numpy as np
 
 from config import settings
 
@@ -34,6 +39,54 @@ class PhotoState(str, enum.Enum):
     FAILED = "failed"
 
 
+# Intermediate states a photo passes through while a worker processes it
+PROCESSING_STATES = (
+    PhotoState.PREPROCESSING,
+    PhotoState.PROCESSING_OBJECTS,
+    PhotoState.PROCESSING_EMBEDDINGS,
+    PhotoState.PROCESSING_OCR,
+    PhotoState.PROCESSING_FACES,
+    PhotoState.PROCESSING_HASH,
+    PhotoState.CHECKING_DUPLICATES,
+)
+
+
+# Stable SMALLINT codes stored in photos.state; never renumber or reuse a code
+PHOTO_STATE_CODES = {
+    PhotoState.PENDING: 0,
+    PhotoState.PREPROCESSING: 1,
+    PhotoState.PROCESSING_OBJECTS: 2,
+    PhotoState.PROCESSING_EMBEDDINGS: 3,
+    PhotoState.PROCESSING_OCR: 4,
+    PhotoState.PROCESSING_FACES: 5,
+    PhotoState.PROCESSING_HASH: 6,
+    PhotoState.CHECKING_DUPLICATES: 7,
+    PhotoState.COMPLETED: 8,
+    PhotoState.PARTIAL: 9,
+    PhotoState.FAILED: 10,
+}
+_PHOTO_STATES_BY_CODE = {code: state for state, code in PHOTO_STATE_CODES.items()}
+
+
+class PhotoStateType(TypeDecorator):
+    """Store PhotoState as a SMALLINT code while exposing PhotoState in Python."""
+    impl = SmallInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return PHOTO_STATE_CODES[PhotoState(value)]
+
+    def process_literal_param(self, value, dialect):
+        return str(self.process_bind_param(value, dialect))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return _PHOTO_STATES_BY_CODE[value]
+
+
 class Photo(Base):
     """Photo table storing image metadata and processing state."""
     __tablename__ = "photos"
@@ -42,7 +95,7 @@ class Photo(Base):
     file_path = Column(String(512), nullable=False, unique=True, index=True)
     filename = Column(String(255), nullable=False)
     thumbnail_path = Column(String(512), nullable=True)
-    state = Column(SQLEnum(PhotoState), default=PhotoState.PENDING, nullable=False, index=True)
+    state = Column(PhotoStateType(), default=PhotoState.PENDING, nullable=False, index=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     processed_at = Column(DateTime, nullable=True)
     file_size = Column(BigInteger, nullable=True)
@@ -58,6 +111,22 @@ class Photo(Base):
     faces = relationship("Face", back_populates="photo", cascade="all, delete-orphan")
     photo_hash = relationship("PhotoHash", back_populates="photo", uselist=False, cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Gallery/status queries filter by state and order by created_at
+        Index("idx_photos_state_created", "state", "created_at"),
+        # Search joins candidates to completed photos (optionally by date);
+        # this small partial index answers that check without the heap
+        Index(
+            "idx_photos_completed", "id", "created_at",
+            postgresql_where=text(f"state = {PHOTO_STATE_CODES[PhotoState.COMPLETED]}"),
+        ),
+        # Gallery keyset pagination: ORDER BY created_at DESC, id DESC
+        Index(
+            "idx_photos_completed_gallery", "created_at", "id",
+            postgresql_where=text(f"state = {PHOTO_STATE_CODES[PhotoState.COMPLETED]}"),
+        ),
+    )
+
     def __repr__(self):
         return f"<Photo(id={self.id}, filename={self.filename}, state={self.state.value})>"
 
@@ -104,7 +173,11 @@ class DetectedObject(Base):
     tag = Column(String(100), nullable=False, index=True)
     confidence = Column(Float, nullable=False)
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=True, index=True)
-    bbox = Column(JSON, nullable=True)  # {x1, y1, x2, y2} from DETR
+    # Bounding box corners in pixels from DETR
+    x1 = Column(Float, nullable=True)
+    y1 = Column(Float, nullable=True)
+    x2 = Column(Float, nullable=True)
+    y2 = Column(Float, nullable=True)
 
     # Relationships
     photo = relationship("Photo", back_populates="detected_objects")
@@ -114,6 +187,21 @@ class DetectedObject(Base):
         Index("idx_detected_objects_photo_tag", "photo_id", "tag"),
     )
 
+    @property
+    def bbox(self) -> Optional[dict]:
+        """Bounding box as {x1, y1, x2, y2}, or None if not recorded."""
+        if self.x1 is None:
+            return None
+        return {"x1": self.x1, "y1": self.y1, "x2": self.x2, "y2": self.y2}
+
+    @bbox.setter
+    def bbox(self, value: Optional[dict]):
+        value = value or {}
+        self.x1 = value.get("x1")
+        self.y1 = value.get("y1")
+        self.x2 = value.get("x2")
+        self.y2 = value.get("y2")
+
     def __repr__(self):
         return f"<DetectedObject(photo_id={self.photo_id}, tag={self.tag}, confidence={self.confidence:.2f})>"
 
@@ -134,25 +222,55 @@ class PhotoTag(Base):
     
     __table_args__ = (
         UniqueConstraint("photo_id", "tag", name="uq_photo_tag"),
-        Index("idx_photo_tags_tag", "tag"),
+        # Tag lookups joined back to photos are served from the index alone
+        Index("idx_photo_tags_tag_photo", "tag", "photo_id"),
+        # Substring (ILIKE '%...%') tag search is served by trigrams
+        Index(
+            "idx_photo_tags_tag_trgm", "tag",
+            postgresql_using="gin", postgresql_ops={"tag": "gin_trgm_ops"},
+        ),
     )
     
     def __repr__(self):
         return f"<PhotoTag(photo_id={self.photo_id}, tag={self.tag}, confidence={self.confidence:.2f})>"
 
 
+def _embedding_to_numpy(value) -> np.ndarray:
+    """Convert a loaded halfvec (pgvector HalfVector) or pending array/list to float32."""
+    if hasattr(value, "to_numpy"):
+        value = value.to_numpy()
+    return np.asarray(value, dtype=np.float32)
+
+
 class SemanticEmbedding(Base):
     """Semantic embeddings for photos (OpenCLIP vectors)."""
     __tablename__ = "semantic_embeddings"
 
     id = Column(Integer, primary_key=True, index=True)
     photo_id = Column(Integer, ForeignKey("photos.id"), nullable=False, unique=True, index=True)
-    embedding = Column(Vector(1024), nullable=False)  # OpenCLIP ViT-H-14 = 1024-dim
+    embedding = Column(HALFVEC(1024), nullable=False)  # OpenCLIP ViT-H-14 = 1024-dim, stored as FP16
     model_version = Column(String(100), nullable=False, default="ViT-H-14/laion2b_s32b_b79k")
 
     # Relationships
     photo = relationship("Photo", back_populates="semantic_embedding")
 
+    __table_args__ = (
+        # Approximate nearest-neighbour index for inner-product search; CLIP
+        # embeddings are L2-normalized, so this ranks exactly like cosine
+        Index(
+            "idx_sem_emb_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "halfvec_ip_ops"},
+        ),
+    )
+
+    @property
+    def embedding_np(self) -> np.ndarray:
+        """Embedding as a float32 numpy array."""
+        return _embedding_to_numpy(self.embedding)
+
     def __repr__(self):
         return f"<SemanticEmbedding(photo_id={self.photo_id}, model={self.model_version})>"
 
@@ -185,13 +303,45 @@ class Face(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     photo_id = Column(Integer, ForeignKey("photos.id"), nullable=False, index=True)
-    bbox = Column(JSON, nullable=False)  # {"x": int, "y": int, "width": int, "height": int}
-    embedding = Column(Vector(512), nullable=False)  # InsightFace buffalo_l = 512-dim
+    # Bounding box in pixels (top-left corner plus size)
+    x = Column(Float, nullable=False)
+    y = Column(Float, nullable=False)
+    width = Column(Float, nullable=False)
+    height = Column(Float, nullable=False)
+    embedding = Column(HALFVEC(512), nullable=False)  # InsightFace buffalo_l = 512-dim, stored as FP16
     cluster_id = Column(Integer, nullable=True, index=True)  # For future face clustering
 
     # Relationships
     photo = relationship("Photo", back_populates="faces")
 
+    __table_args__ = (
+        # Approximate nearest-neighbour index for face similarity / clustering
+        Index(
+            "idx_face_emb_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "halfvec_cosine_ops"},
+        ),
+    )
+
+    @property
+    def embedding_np(self) -> np.ndarray:
+        """Embedding as a float32 numpy array."""
+        return _embedding_to_numpy(self.embedding)
+
+    @property
+    def bbox(self) -> dict:
+        """Bounding box as {x, y, width, height}."""
+        return {"x": self.x, "y": self.y, "width": self.width, "height": self.height}
+
+    @bbox.setter
+    def bbox(self, value: dict):
+        self.x = value["x"]
+        self.y = value["y"]
+        self.width = value["width"]
+        self.height = value["height"]
+
     def __repr__(self):
         return f"<Face(id={self.id}, photo_id={self.photo_id}, cluster_id={self.cluster_id})>"
 
@@ -202,14 +352,23 @@ class PhotoHash(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     photo_id = Column(Integer, ForeignKey("photos.id"), nullable=False, unique=True, index=True)
-    pdq_hash = Column(String(64), nullable=False, index=True)  # PDQ hash as hex string
+    pdq_hash = Column(LargeBinary(32), nullable=False, index=True)  # 256-bit PDQ hash as raw bytes
     quality_score = Column(Float, nullable=True)
 
     # Relationships
     photo = relationship("Photo", back_populates="photo_hash")
 
+    __table_args__ = (
+        # Tiny partial index (normally empty) for finding malformed hashes
+        Index(
+            "idx_photo_hashes_invalid_length",
+            func.length(pdq_hash),
+            postgresql_where=func.length(pdq_hash) != 32,
+        ),
+    )
+
     def __repr__(self):
-        return f"<PhotoHash(photo_id={self.photo_id}, hash={self.pdq_hash[:16]}...)>"
+        return f"<PhotoHash(photo_id={self.photo_id}, hash={self.pdq_hash.hex()[:16]}...)>"
 
 
 class Duplicate(Base):
@@ -232,27 +391,54 @@ class Duplicate(Base):
 # Database initialization functions
 
 def get_engine():
-    """Create SQLAlchemy engine."""
-    return create_engine(
-        settings.DATABASE_URL,
-        echo=settings.FLASK_DEBUG,
+    """Get the process-wide SQLAlchemy engine for the configured database."""
+    return _get_engine(settings.DATABASE_URL, settings.FLASK_DEBUG)
+
+
+# Engines created in this process, so forked children can drop inherited pools
+_engines = weakref.WeakSet()
+
+
+@lru_cache(maxsize=None)
+def _get_engine(database_url: str, echo: bool):
+    """Create (once per URL) the SQLAlchemy engine and its connection pool."""
+    engine = create_engine(
+        database_url,
+        echo=echo,
         pool_pre_ping=True,
         pool_size=20,  # Increased for web app concurrent requests
         max_overflow=40,  # Allow bursts of connections
         pool_recycle=3600,  # Recycle connections after 1 hour
         pool_timeout=30  # Timeout for getting connection from pool
     )
+    _engines.add(engine)
+    return engine
 
 
-def init_db():
-    """Initialize database tables and pgvector extension."""
-    from sqlalchemy import text
+def _dispose_engines_after_fork() -> None:
+    """
+    Give a forked child fresh connection pools.
     
+    Pooled connections inherited from the parent (Celery prefork, gunicorn
+    --preload, multiprocessing) share sockets with it; close=False drops
+    them without sending a termination message over the parent's sockets.
+    """
+    for engine in list(_engines):
+        engine.dispose(close=False)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_dispose_engines_after_fork)
+
+
+def init_db():
+    """Initialize database tables and the pgvector and pg_trgm extensions."""
     engine = get_engine()
     
-    # Enable pgvector extension
+    # Enable pgvector and trigram extensions
     with engine.connect() as conn:
         conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         conn.commit()
     
     # Create all tables
@@ -266,6 +452,15 @@ def get_session() -> Session:
     return Session(engine)
 
 
+# Built once at import; SQLAlchemy's compiled cache reuses its SQL on each call
+_COUNT_BY_STATE = select(Photo.state, func.count(Photo.id)).group_by(Photo.state)
+
+
+def count_photos_by_state(session: Session) -> Dict[PhotoState, int]:
+    """Count photos per state in a single GROUP BY query (absent states omitted)."""
+    return {state: count for state, count in session.execute(_COUNT_BY_STATE).all()}
+
+
 def drop_all_tables():
     """Drop all tables (use with caution!)."""
     engine = get_engine()
@@ -7,6 +7,16 @@ from typing import List, Optional, Dict
 from pydantic import BaseModel, Field, ConfigDict
 
 
+# Response schemas are built once per result and never mutated afterwards
+_RESPONSE_CONFIG = ConfigDict(
+    from_attributes=True,
+    frozen=True,
+    extra="ignore",
+    validate_assignment=False,
+    arbitrary_types_allowed=False,
+)
+
+
 class PhotoBase(BaseModel):
     """Base photo schema."""
     filename: str
@@ -22,7 +32,7 @@ class PhotoCreate(PhotoBase):
 
 class PhotoResponse(PhotoBase):
     """Schema for photo response."""
-    model_config = ConfigDict(from_attributes=True)
+    model_config = _RESPONSE_CONFIG
     
     id: int
     thumbnail_path: Optional[str] = None
@@ -36,7 +46,7 @@ class PhotoResponse(PhotoBase):
 
 class PhotoTagResponse(BaseModel):
     """Schema for unique photo tag response."""
-    model_config = ConfigDict(from_attributes=True)
+    model_config = _RESPONSE_CONFIG
     
     id: int
     tag: str
@@ -66,6 +76,8 @@ class SearchRequest(BaseModel):
 
 class SearchResultItem(BaseModel):
     """Schema for single search result."""
+    model_config = _RESPONSE_CONFIG
+    
     photo: PhotoResponse
     score: float
     matched_tags: List[str] = []
@@ -74,6 +86,8 @@ class SearchResultItem(BaseModel):
 
 class SearchResponse(BaseModel):
     """Schema for search response."""
+    model_config = _RESPONSE_CONFIG
+    
     results: List[SearchResultItem]
     total: int
     page: int
@@ -83,6 +97,8 @@ class SearchResponse(BaseModel):
 
 class StatsResponse(BaseModel):
     """Schema for processing statistics."""
+    model_config = _RESPONSE_CONFIG
+    
     total_photos: int
     completed: int
     pending: int
@@ -94,7 +110,7 @@ class StatsResponse(BaseModel):
 
 class CategoryResponse(BaseModel):
     """Schema for category response."""
-    model_config = ConfigDict(from_attributes=True)
+    model_config = _RESPONSE_CONFIG
     
     id: int
     name: str
@@ -3,149 +3,259 @@ System status checker for AI Photos Management.
 Displays current processing status and system health.
 """
 
+import asyncio
+import http.client
+import json
+import os
+import socket
+import subprocess
 import sys
 from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import requests
-from models import get_session, Photo, PhotoState
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from config import settings
+from models import PhotoState, PROCESSING_STATES, count_photos_by_state
 
+# Shared HTTP session so repeated checks reuse the keep-alive connection
+_http = requests.Session()
 
-def check_docker_services():
+DOCKER_SOCKET = "/var/run/docker.sock"
+CELERY_INSPECT_TIMEOUT = 0.25  # seconds to wait for worker replies
+CELERY_PIDBOX_BINDINGS = "_kombu.binding.celery.pidbox"  # worker control queues
+DOCKER_SERVICES = ("postgres", "redis")
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a UNIX socket (used for the Docker Engine API)."""
+
+    def __init__(self, socket_path: str, timeout: float = 2):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def _status_engine():
+    """Create a non-pooled engine; the status check needs a single short-lived connection."""
+    return create_engine(settings.DATABASE_URL, poolclass=NullPool)
+
+
+def _capture(probe: Callable[[], Any]) -> Tuple[Any, Optional[Exception]]:
+    """Run a probe and return (result, error) so failures can be reported later."""
+    try:
+        return probe(), None
+    except Exception as e:
+        return None, e
+
+
+def probe_docker_services() -> Dict[str, bool]:
+    """Return whether each Docker service container is running."""
+    if not os.path.exists(DOCKER_SOCKET):
+        return _probe_docker_compose()
+
+    # Ask the Docker Engine directly instead of spawning docker-compose
+    conn = _UnixHTTPConnection(DOCKER_SOCKET)
+    try:
+        conn.request("GET", "/containers/json")
+        response = conn.getresponse()
+        if response.status != 200:
+            raise RuntimeError(f"Docker API returned status code: {response.status}")
+        containers = json.loads(response.read())
+    finally:
+        conn.close()
+
+    running_names = [
+        name
+        for container in containers
+        if container.get("State") == "running"
+        for name in container.get("Names", [])
+    ]
+    return {
+        service: any(service in name for name in running_names)
+        for service in DOCKER_SERVICES
+    }
+
+
+def _probe_docker_compose() -> Dict[str, bool]:
+    """Fallback probe using `docker-compose ps` when the socket is unavailable."""
+    result = subprocess.run(
+        ['docker-compose', 'ps'],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return {
+        service: service in result.stdout and 'Up' in result.stdout
+        for service in DOCKER_SERVICES
+    }
+
+
+def check_docker_services(outcome=None):
     """Check if Docker services are running."""
     print("\n" + "=" * 60)
     print("Docker Services")
     print("=" * 60)
     
-    import subprocess
+    services, error = outcome or _capture(probe_docker_services)
     
-    try:
-        result = subprocess.run(
-            ['docker-compose', 'ps'],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        
-        if 'postgres' in result.stdout and 'Up' in result.stdout:
-            print("✓ PostgreSQL: Running")
-        else:
-            print("✗ PostgreSQL: Not running")
-            
-        if 'redis' in result.stdout and 'Up' in result.stdout:
-            print("✓ Redis: Running")
-        else:
-            print("✗ Redis: Not running")
-            
-    except Exception as e:
-        print(f"✗ Docker services check failed: {e}")
+    if error is not None:
+        print(f"✗ Docker services check failed: {error}")
         print("  Run: docker-compose ps")
+        return
+    
+    if services['postgres']:
+        print("✓ PostgreSQL: Running")
+    else:
+        print("✗ PostgreSQL: Not running")
+        
+    if services['redis']:
+        print("✓ Redis: Running")
+    else:
+        print("✗ Redis: Not running")
+
 
+def probe_database() -> Dict[PhotoState, int]:
+    """Return photo counts keyed by state."""
+    engine = _status_engine()
+    session = Session(engine)
+    
+    try:
+        # Get photo counts by state in a single round-trip
+        return count_photos_by_state(session)
+    finally:
+        session.close()
+        engine.dispose()
 
-def check_database_connection():
+
+def check_database_connection(outcome=None):
     """Check database connection and photo counts."""
     print("\n" + "=" * 60)
     print("Database Status")
     print("=" * 60)
     
-    try:
-        session = get_session()
-        
-        # Get photo counts by state
-        total = session.query(Photo).count()
-        completed = session.query(Photo).filter(Photo.state == PhotoState.COMPLETED).count()
-        pending = session.query(Photo).filter(Photo.state == PhotoState.PENDING).count()
-        failed = session.query(Photo).filter(Photo.state == PhotoState.FAILED).count()
-        partial = session.query(Photo).filter(Photo.state == PhotoState.PARTIAL).count()
-        
-        processing_states = [
-            PhotoState.PREPROCESSING,
-            PhotoState.PROCESSING_OBJECTS,
-            PhotoState.PROCESSING_EMBEDDINGS,
-            PhotoState.PROCESSING_OCR,
-            PhotoState.PROCESSING_FACES,
-            PhotoState.PROCESSING_HASH,
-            PhotoState.CHECKING_DUPLICATES
-        ]
-        processing = session.query(Photo).filter(Photo.state.in_(processing_states)).count()
-        
-        session.close()
-        
-        print(f"✓ Database connection successful")
-        print(f"\nPhoto Processing Status:")
-        print(f"  Total photos: {total}")
-        print(f"  ✓ Completed: {completed}")
-        print(f"  ⏳ Processing: {processing}")
-        print(f"  ⏸️  Pending: {pending}")
-        print(f"  ⚠️  Partial: {partial}")
-        print(f"  ✗ Failed: {failed}")
-        
-        if total > 0:
-            completion_pct = (completed / total) * 100
-            print(f"\n  Progress: {completion_pct:.1f}% complete")
-        
-    except Exception as e:
-        print(f"✗ Database connection failed: {e}")
+    counts, error = outcome or _capture(probe_database)
+    
+    if error is not None:
+        print(f"✗ Database connection failed: {error}")
+        return
+    
+    total = sum(counts.values())
+    completed = counts.get(PhotoState.COMPLETED, 0)
+    pending = counts.get(PhotoState.PENDING, 0)
+    failed = counts.get(PhotoState.FAILED, 0)
+    partial = counts.get(PhotoState.PARTIAL, 0)
+    processing = sum(counts.get(state, 0) for state in PROCESSING_STATES)
+    
+    print(f"✓ Database connection successful")
+    print(f"\nPhoto Processing Status:")
+    print(f"  Total photos: {total}")
+    print(f"  ✓ Completed: {completed}")
+    print(f"  ⏳ Processing: {processing}")
+    print(f"  ⏸️  Pending: {pending}")
+    print(f"  ⚠️  Partial: {partial}")
+    print(f"  ✗ Failed: {failed}")
+    
+    if total > 0:
+        completion_pct = (completed / total) * 100
+        print(f"\n  Progress: {completion_pct:.1f}% complete")
+
 
+def probe_flask_app() -> requests.Response:
+    """Return the Flask app's /api/stats response."""
+    return _http.get('http://localhost:5000/api/stats', timeout=2)
 
-def check_flask_app():
+
+def check_flask_app(outcome=None):
     """Check if Flask app is running."""
     print("\n" + "=" * 60)
     print("Flask Web Application")
     print("=" * 60)
     
-    try:
-        response = requests.get('http://localhost:5000/api/stats', timeout=2)
-        
-        if response.status_code == 200:
-            print("✓ Flask app is running")
-            print("  URL: http://localhost:5000")
-            
-            stats = response.json()
-            print(f"\n  API Stats:")
-            print(f"    Total: {stats['total_photos']}")
-            print(f"    Completed: {stats['completed']}")
-            print(f"    Progress: {stats['completion_percentage']:.1f}%")
-        else:
-            print(f"⚠️ Flask app returned status code: {response.status_code}")
-            
-    except requests.exceptions.ConnectionError:
+    response, error = outcome or _capture(probe_flask_app)
+    
+    if isinstance(error, requests.exceptions.ConnectionError):
         print("✗ Flask app is not running")
         print("  Start with: python webapp/app.py")
-    except Exception as e:
-        print(f"✗ Flask app check failed: {e}")
+        return
+    if error is not None:
+        print(f"✗ Flask app check failed: {error}")
+        return
+    
+    if response.status_code == 200:
+        print("✓ Flask app is running")
+        print("  URL: http://localhost:5000")
+        
+        stats = response.json()
+        print(f"\n  API Stats:")
+        print(f"    Total: {stats['total_photos']}")
+        print(f"    Completed: {stats['completed']}")
+        print(f"    Progress: {stats['completion_percentage']:.1f}%")
+    else:
+        print(f"⚠️ Flask app returned status code: {response.status_code}")
 
 
-def check_celery_worker():
+def probe_celery_worker() -> Optional[Dict[str, List]]:
+    """Return active tasks per Celery worker (None when no worker replies)."""
+    import redis
+    
+    # One cheap round-trip to the broker before any pub/sub broadcast:
+    # fail fast when Redis is down, and skip the broadcast when no worker
+    # has bound a control (pidbox) queue
+    broker = redis.Redis.from_url(settings.CELERY_BROKER_URL, socket_timeout=1)
+    try:
+        broker.ping()
+        if not broker.scard(CELERY_PIDBOX_BINDINGS):
+            return None
+    finally:
+        broker.close()
+    
+    from workers.celery_app import app
+    
+    # Healthy workers reply within milliseconds; don't wait the default 1s
+    inspect = app.control.inspect(timeout=CELERY_INSPECT_TIMEOUT)
+    return inspect.active()
+
+
+def check_celery_worker(outcome=None):
     """Check if Celery worker is running."""
     print("\n" + "=" * 60)
     print("Celery Worker")
     print("=" * 60)
     
-    try:
-        from workers.celery_app import app
-        
-        # Check active workers
-        inspect = app.control.inspect()
-        active_workers = inspect.active()
-        
-        if active_workers:
-            print(f"✓ Celery worker(s) running: {len(active_workers)}")
-            for worker_name in active_workers.keys():
-                print(f"  - {worker_name}")
-                
-            # Check active tasks
-            for worker, tasks in active_workers.items():
-                print(f"\n  Active tasks on {worker}: {len(tasks)}")
-        else:
-            print("✗ No Celery workers detected")
-            print("  Start with: celery -A workers.celery_app worker --concurrency=4")
-            
-    except Exception as e:
-        print(f"✗ Celery worker check failed: {e}")
+    active_workers, error = outcome or _capture(probe_celery_worker)
+    
+    if error is not None:
+        print(f"✗ Celery worker check failed: {error}")
         print("  Make sure Redis is running")
+        return
+    
+    if active_workers:
+        print(f"✓ Celery worker(s) running: {len(active_workers)}")
+        for worker_name in active_workers.keys():
+            print(f"  - {worker_name}")
+            
+        # Check active tasks
+        for worker, tasks in active_workers.items():
+            print(f"\n  Active tasks on {worker}: {len(tasks)}")
+    else:
+        print("✗ No Celery workers detected")
+        print("  Start with: celery -A workers.celery_app worker --concurrency=4")
+
+
+async def _run_probes():
+    """Run the independent I/O-bound probes concurrently."""
+    probes = (probe_docker_services, probe_database, probe_celery_worker, probe_flask_app)
+    return await asyncio.gather(*(asyncio.to_thread(_capture, probe) for probe in probes))
 
 
 def main():
@@ -154,10 +264,13 @@ def main():
     print("AI Photos Management - System Status")
     print("=" * 60)
     
-    check_docker_services()
-    check_database_connection()
-    check_celery_worker()
-    check_flask_app()
+    # Probe everything at once, then report in a fixed order
+    docker, database, celery, flask = asyncio.run(_run_probes())
+    
+    check_docker_services(docker)
+    check_database_connection(database)
+    check_celery_worker(celery)
+    check_flask_app(flask)
     
     print("\n" + "=" * 60)
     print("Status Check Complete")
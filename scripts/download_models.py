@@ -3,149 +3,199 @@ Script to pre-download all AI models.
 Downloads DETR, OpenCLIP, PaddleOCR, and InsightFace models to cache directory.
 """
 
+import argparse
+import importlib.util
 import os
+import shutil
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# Let transformers fetch/load checkpoint shards in parallel as well
+os.environ.setdefault("HF_ENABLE_PARALLEL_LOADING", "true")
+os.environ.setdefault("HF_PARALLEL_LOADING_WORKERS", "8")
+
+# Use the Rust multi-connection downloader when hf_transfer is installed
+# (huggingface_hub errors if the flag is set without it)
+if importlib.util.find_spec("hf_transfer") is not None:
+    os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+
+# Parallel file downloads per Hugging Face snapshot
+HF_DOWNLOAD_WORKERS = 8
+
 from config import settings
-import torch
-from transformers import DetrImageProcessor, DetrForObjectDetection
-import open_clip
-from paddleocr import PaddleOCR
-import insightface
+
+# Heavy ML libraries are imported inside the functions that need them, after
+# the cache checks, so cache/disk checks and cached models start instantly
+
+
+# Downloads run concurrently; keep each printed line intact
+_print_lock = threading.Lock()
+
+
+def _print(*args, **kwargs):
+    """Thread-safe print used by the download_* functions."""
+    with _print_lock:
+        print(*args, **kwargs)
 
 
 def download_detr():
     """Download DETR model from HuggingFace."""
-    print("\n" + "=" * 60)
-    print("Downloading DETR Model")
-    print("=" * 60)
-    print(f"Model: {settings.DETR_MODEL_NAME}")
-    print(f"Cache directory: {settings.MODEL_CACHE_DIR}")
+    _print("\n" + "=" * 60)
+    _print("Downloading DETR Model")
+    _print("=" * 60)
+    _print(f"Model: {settings.DETR_MODEL_NAME}")
+    _print(f"Cache directory: {settings.MODEL_CACHE_DIR}")
     
     # Check if already cached
     detr_cache = settings.MODEL_CACHE_DIR / "models--facebook--detr-resnet-50"
     if detr_cache.exists():
-        print("⏭️  DETR already cached, skipping download")
+        _print("⏭️  DETR already cached, skipping download")
         return True
     
     try:
-        print("📥 Downloading DETR processor...")
+        from huggingface_hub import snapshot_download
+        from transformers import DetrImageProcessor, DetrForObjectDetection
+        
+        _print("📥 Downloading DETR model files...")
+        snapshot_download(
+            repo_id=settings.DETR_MODEL_NAME,
+            cache_dir=settings.MODEL_CACHE_DIR,
+            allow_patterns=["*.json", "*.safetensors", "*.txt"],
+            max_workers=HF_DOWNLOAD_WORKERS,
+            etag_timeout=30
+        )
+        
+        # Load once from the populated cache to verify the files
+        _print("📥 Loading DETR processor...")
         processor = DetrImageProcessor.from_pretrained(
             settings.DETR_MODEL_NAME,
             cache_dir=settings.MODEL_CACHE_DIR
         )
         
-        print("📥 Downloading DETR model...")
+        _print("📥 Loading DETR model...")
         model = DetrForObjectDetection.from_pretrained(
             settings.DETR_MODEL_NAME,
             cache_dir=settings.MODEL_CACHE_DIR
         )
         
-        print(f"✓ DETR model downloaded successfully")
-        print(f"  Model: {settings.DETR_MODEL_NAME}")
-        print(f"  Size: ~159MB")
-        print(f"  Detects 91 COCO object classes")
+        _print(f"✓ DETR model downloaded successfully")
+        _print(f"  Model: {settings.DETR_MODEL_NAME}")
+        _print(f"  Size: ~159MB")
+        _print(f"  Detects 91 COCO object classes")
         
         return True
         
     except Exception as e:
-        print(f"✗ Failed to download DETR model: {e}")
-        print("  You can try manually downloading from:")
-        print(f"  https://huggingface.co/{settings.DETR_MODEL_NAME}")
+        _print(f"✗ Failed to download DETR model: {e}")
+        _print("  You can try manually downloading from:")
+        _print(f"  https://huggingface.co/{settings.DETR_MODEL_NAME}")
         return False
 
 
 def download_openclip():
     """Download OpenCLIP model."""
-    print("\n" + "=" * 60)
-    print("Downloading OpenCLIP Model")
-    print("=" * 60)
-    print(f"Model: {settings.OPENCLIP_MODEL_NAME}")
-    print(f"Pretrained: {settings.OPENCLIP_PRETRAINED}")
-    print(f"Cache directory: {settings.MODEL_CACHE_DIR}")
+    _print("\n" + "=" * 60)
+    _print("Downloading OpenCLIP Model")
+    _print("=" * 60)
+    _print(f"Model: {settings.OPENCLIP_MODEL_NAME}")
+    _print(f"Pretrained: {settings.OPENCLIP_PRETRAINED}")
+    _print(f"Cache directory: {settings.MODEL_CACHE_DIR}")
     
     # Check if already cached
     openclip_cache = settings.MODEL_CACHE_DIR / "open_clip"
     if openclip_cache.exists() and list(openclip_cache.glob("*laion*.pt")):
-        print("⏭️  OpenCLIP already cached, skipping download")
+        _print("⏭️  OpenCLIP already cached, skipping download")
         return True
     
     try:
-        print("📥 Downloading OpenCLIP model files...")
+        import open_clip
+        
+        _print("📥 Downloading OpenCLIP model files...")
         
-        # Download model, preprocess, and tokenizer
-        model, _, preprocess = open_clip.create_model_and_transforms(
+        # Fetch the pretrained weights without instantiating the (~3 GB) model
+        pretrained_cfg = open_clip.get_pretrained_cfg(
             settings.OPENCLIP_MODEL_NAME,
-            pretrained=settings.OPENCLIP_PRETRAINED,
+            settings.OPENCLIP_PRETRAINED
+        )
+        if not pretrained_cfg:
+            raise ValueError(
+                f"Unknown pretrained tag '{settings.OPENCLIP_PRETRAINED}' "
+                f"for {settings.OPENCLIP_MODEL_NAME}"
+            )
+        checkpoint_path = open_clip.download_pretrained(
+            pretrained_cfg,
             cache_dir=settings.MODEL_CACHE_DIR
         )
+        if not checkpoint_path:
+            raise RuntimeError("No download source available for pretrained weights")
         
-        tokenizer = open_clip.get_tokenizer(settings.OPENCLIP_MODEL_NAME)
-        
-        print("✓ OpenCLIP model downloaded successfully")
+        _print("✓ OpenCLIP model downloaded successfully")
         
-        # Get embedding dimension
-        with torch.no_grad():
-            dummy_text = tokenizer(["test"])
-            text_features = model.encode_text(dummy_text)
-            print(f"  Embedding dimension: {text_features.shape[1]}")
+        # Embedding dimension is a static property of the architecture
+        model_cfg = open_clip.get_model_config(settings.OPENCLIP_MODEL_NAME)
+        _print(f"  Embedding dimension: {model_cfg['embed_dim']}")
         
         return True
         
     except Exception as e:
-        print(f"✗ Failed to download OpenCLIP model: {e}")
+        _print(f"✗ Failed to download OpenCLIP model: {e}")
         return False
 
 
 def download_paddleocr():
     """Download PaddleOCR models."""
-    print("\n" + "=" * 60)
-    print("Downloading PaddleOCR Models")
-    print("=" * 60)
-    print("Languages: English (en), with angle classification")
+    _print("\n" + "=" * 60)
+    _print("Downloading PaddleOCR Models")
+    _print("=" * 60)
+    _print("Languages: English (en), with angle classification")
     
     # Check if already cached
     paddle_cache = Path.home() / ".paddleocr"
     if paddle_cache.exists() and list(paddle_cache.glob("**/en_*")):
-        print("⏭️  PaddleOCR already cached, skipping download")
+        _print("⏭️  PaddleOCR already cached, skipping download")
         return True
     
     try:
-        print("📥 Downloading PaddleOCR model files...")
+        from paddleocr import PaddleOCR
+        
+        _print("📥 Downloading PaddleOCR model files...")
         
         # Initialize PaddleOCR (downloads models on first use)
         # Note: Newer PaddleOCR API is simpler - auto-detects GPU
         ocr = PaddleOCR(lang='en')
         
-        print("✓ PaddleOCR models downloaded successfully")
-        print("  Components: Detection, Recognition, Angle Classification")
+        _print("✓ PaddleOCR models downloaded successfully")
+        _print("  Components: Detection, Recognition, Angle Classification")
         
         return True
         
     except Exception as e:
-        print(f"✗ Failed to download PaddleOCR models: {e}")
+        _print(f"✗ Failed to download PaddleOCR models: {e}")
         return False
 
 
 def download_insightface():
     """Download InsightFace buffalo_l model."""
-    print("\n" + "=" * 60)
-    print("Downloading InsightFace Model")
-    print("=" * 60)
-    print(f"Model: {settings.INSIGHTFACE_MODEL_NAME}")
+    _print("\n" + "=" * 60)
+    _print("Downloading InsightFace Model")
+    _print("=" * 60)
+    _print(f"Model: {settings.INSIGHTFACE_MODEL_NAME}")
     
     # Check if already cached
     insightface_cache = settings.MODEL_CACHE_DIR / "insightface" / settings.INSIGHTFACE_MODEL_NAME
     if insightface_cache.exists() and list(insightface_cache.glob("*.onnx")):
-        print("⏭️  InsightFace already cached, skipping download")
+        _print("⏭️  InsightFace already cached, skipping download")
         return True
     
     try:
-        print("📥 Downloading InsightFace model files...")
+        import insightface
+        
+        _print("📥 Downloading InsightFace model files...")
         
         # Initialize InsightFace app (downloads model on first use)
         app = insightface.app.FaceAnalysis(
@@ -156,24 +206,23 @@ def download_insightface():
         # Prepare with CPU (just to download, actual inference will use GPU if available)
         app.prepare(ctx_id=-1, det_size=(640, 640))
         
-        print("✓ InsightFace model downloaded successfully")
-        print(f"  Model: {settings.INSIGHTFACE_MODEL_NAME}")
-        print("  Detection size: 640x640")
+        _print("✓ InsightFace model downloaded successfully")
+        _print(f"  Model: {settings.INSIGHTFACE_MODEL_NAME}")
+        _print("  Detection size: 640x640")
         
         return True
         
     except Exception as e:
-        print(f"✗ Failed to download InsightFace model: {e}")
+        _print(f"✗ Failed to download InsightFace model: {e}")
         return False
 
 
-def check_disk_space():
+def check_disk_space(assume_yes: bool = False):
     """Check available disk space in cache directory."""
     cache_dir = settings.MODEL_CACHE_DIR
     cache_dir.mkdir(parents=True, exist_ok=True)
     
-    stat = os.statvfs(cache_dir)
-    available_gb = (stat.f_bavail * stat.f_frsize) / (1024 ** 3)
+    available_gb = shutil.disk_usage(cache_dir).free / (1024 ** 3)
     
     print("\n" + "=" * 60)
     print("Disk Space Check")
@@ -186,7 +235,7 @@ def check_disk_space():
         print(f"\n⚠ WARNING: Low disk space!")
         print(f"  Required: ~{required_gb} GB")
         print(f"  Available: {available_gb:.2f} GB")
-        response = input("Continue anyway? (yes/no): ")
+        response = "yes" if assume_yes else input("Continue anyway? (yes/no): ")
         return response.lower() == "yes"
     
     print(f"✓ Sufficient disk space ({available_gb:.2f} GB available)")
@@ -199,6 +248,12 @@ def check_gpu():
     print("GPU Check")
     print("=" * 60)
     
+    try:
+        import torch
+    except ImportError:
+        print("⚠ PyTorch is not installed - cannot check GPU availability")
+        return
+    
     if torch.cuda.is_available():
         gpu_count = torch.cuda.device_count()
         print(f"✓ CUDA available: {gpu_count} GPU(s) detected")
@@ -267,8 +322,20 @@ def check_cached_models():
     return models_status
 
 
-def main():
+def parse_args(argv=None):
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Pre-download all AI models.")
+    parser.add_argument(
+        "-y", "--yes", action="store_true",
+        help="answer yes to all prompts (for CI/cron)"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main function to download all models."""
+    args = parse_args(argv)
+    
     print("\n" + "=" * 60)
     print("AI Photos Management - Model Download Script")
     print("=" * 60)
@@ -281,7 +348,7 @@ def main():
     print(f"Cache directory: {settings.MODEL_CACHE_DIR}")
     
     # Check prerequisites
-    if not check_disk_space():
+    if not check_disk_space(assume_yes=args.yes):
         print("\n✗ Insufficient disk space. Aborting.")
         return 1
     
@@ -292,7 +359,7 @@ def main():
     
     # Confirm download
     print("\n" + "-" * 60)
-    response = input("Proceed with downloads? (yes/no): ").strip().lower()
+    response = "yes" if args.yes else input("Proceed with downloads? (yes/no): ").strip().lower()
     
     if response != "yes":
         print(f"\nDownload cancelled (you typed: '{response}').")
@@ -300,13 +367,16 @@ def main():
     
     print("\n✓ Starting downloads...")
     
-    # Download models
-    results = {
-        "DETR": download_detr(),
-        "OpenCLIP": download_openclip(),
-        "PaddleOCR": download_paddleocr(),
-        "InsightFace": download_insightface()
+    # Download models concurrently; each is dominated by network I/O
+    downloads = {
+        "DETR": download_detr,
+        "OpenCLIP": download_openclip,
+        "PaddleOCR": download_paddleocr,
+        "InsightFace": download_insightface
     }
+    with ThreadPoolExecutor(max_workers=len(downloads)) as executor:
+        futures = {name: executor.submit(download) for name, download in downloads.items()}
+    results = {name: future.result() for name, future in futures.items()}
     
     # Summary
     print("\n" + "=" * 60)
@@ -2,11 +2,12 @@
 Script to fix PDQ hashes that were stored incorrectly.
 
 Old format: 512-character binary string (e.g., "010001...")
-New format: 64-character hex string (e.g., "a3f2b1...")
+Current format: 32 raw bytes (256 bits)
 
 This script deletes invalid hashes so they can be regenerated.
 """
 
+import argparse
 import sys
 from pathlib import Path
 
@@ -14,10 +15,16 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from models import get_session, PhotoHash
-from sqlalchemy import func
+from sqlalchemy import delete, func, select
 
+# PDQ hashes are 256 bits
+PDQ_HASH_BYTES = 32
 
-def fix_pdq_hashes():
+# Server-side predicate for malformed hashes (served by a partial index)
+INVALID_HASH = func.length(PhotoHash.pdq_hash) != PDQ_HASH_BYTES
+
+
+def fix_pdq_hashes(assume_yes: bool = False):
     """Delete PDQ hashes that are the wrong length."""
     print("=" * 60)
     print("PDQ Hash Cleanup Script")
@@ -34,25 +41,25 @@ def fix_pdq_hashes():
             print("\n✓ No hashes to fix (database is empty)")
             return
         
-        # Find hashes with wrong length (should be exactly 64 characters)
-        invalid_hashes = session.query(PhotoHash).filter(
-            func.length(PhotoHash.pdq_hash) != 64
-        ).all()
-        
-        invalid_count = len(invalid_hashes)
+        # Count hashes with wrong length (should be exactly 32 bytes)
+        invalid_count = session.scalar(
+            select(func.count()).select_from(PhotoHash).where(INVALID_HASH)
+        )
         
         if invalid_count == 0:
-            print("\n✓ All hashes are valid (64 characters)")
+            print(f"\n✓ All hashes are valid ({PDQ_HASH_BYTES} bytes)")
             print("\nNo cleanup needed!")
             return
         
         print(f"\n⚠️  Found {invalid_count} invalid hashes:")
         
         # Show sample of invalid hashes
-        for i, hash_record in enumerate(invalid_hashes[:5]):
-            hash_len = len(hash_record.pdq_hash)
-            hash_preview = hash_record.pdq_hash[:20] + "..."
-            print(f"  - Photo ID {hash_record.photo_id}: {hash_len} chars ({hash_preview})")
+        preview = session.execute(
+            select(PhotoHash.photo_id, PhotoHash.pdq_hash).where(INVALID_HASH).limit(5)
+        ).all()
+        for photo_id, pdq_hash in preview:
+            hash_preview = pdq_hash.hex()[:20] + "..."
+            print(f"  - Photo ID {photo_id}: {len(pdq_hash)} bytes ({hash_preview})")
         
         if invalid_count > 5:
             print(f"  ... and {invalid_count - 5} more")
@@ -63,7 +70,7 @@ def fix_pdq_hashes():
         print("They will be regenerated when photos are reprocessed.")
         print("-" * 60)
         
-        response = input("\nProceed with deletion? (yes/no): ").strip().lower()
+        response = "yes" if assume_yes else input("\nProceed with deletion? (yes/no): ").strip().lower()
         
         if response != "yes":
             print(f"\nDeletion cancelled (you typed: '{response}').")
@@ -72,9 +79,10 @@ def fix_pdq_hashes():
         # Delete invalid hashes
         print(f"\n🗑️  Deleting {invalid_count} invalid hashes...")
         
-        deleted_count = session.query(PhotoHash).filter(
-            func.length(PhotoHash.pdq_hash) != 64
-        ).delete(synchronize_session='fetch')
+        deleted_count = session.execute(
+            delete(PhotoHash).where(INVALID_HASH),
+            execution_options={"synchronize_session": False}
+        ).rowcount
         
         session.commit()
         
@@ -101,5 +109,12 @@ def fix_pdq_hashes():
 
 
 if __name__ == "__main__":
-    fix_pdq_hashes()
+    parser = argparse.ArgumentParser(description="Delete malformed PDQ hashes.")
+    parser.add_argument(
+        "-y", "--yes", action="store_true",
+        help="delete without asking for confirmation"
+    )
+    args = parser.parse_args()
+    
+    fix_pdq_hashes(assume_yes=args.yes)
 
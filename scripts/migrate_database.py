@@ -0,0 +1,279 @@
+"""
+In-place schema migrations for existing databases.
+
+init_db() only creates missing tables, so column type changes made to the
+models must be applied to databases created by older versions with this
+script. Every step is idempotent and safe to re-run.
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from models import get_engine
+from models.database import PHOTO_STATE_CODES, PhotoState
+
+
+def _column_type(conn, table: str, column: str):
+    """Return the data_type of a column, or None if it does not exist."""
+    return conn.execute(
+        text(
+            "SELECT data_type FROM information_schema.columns "
+            "WHERE table_name = :table AND column_name = :column"
+        ),
+        {"table": table, "column": column},
+    ).scalar()
+
+
+def migrate_pdq_hash_to_bytea(conn) -> bool:
+    """Convert photo_hashes.pdq_hash from 64-char hex text to 32-byte BYTEA."""
+    if _column_type(conn, "photo_hashes", "pdq_hash") != "character varying":
+        return False
+
+    # Drop hashes that are not valid 64-char hex; they are regenerated on reprocessing
+    conn.execute(text(
+        "DELETE FROM photo_hashes WHERE pdq_hash !~ '^[0-9a-fA-F]{64}$'"
+    ))
+    conn.execute(text(
+        "ALTER TABLE photo_hashes "
+        "ALTER COLUMN pdq_hash TYPE BYTEA USING decode(pdq_hash, 'hex')"
+    ))
+    return True
+
+
+def migrate_bbox_json_to_columns(conn) -> bool:
+    """Expand JSON bbox columns on detected_objects and faces into float columns."""
+    applied = False
+
+    if _column_type(conn, "detected_objects", "bbox") is not None:
+        conn.execute(text(
+            "ALTER TABLE detected_objects "
+            "ADD COLUMN IF NOT EXISTS x1 DOUBLE PRECISION, "
+            "ADD COLUMN IF NOT EXISTS y1 DOUBLE PRECISION, "
+            "ADD COLUMN IF NOT EXISTS x2 DOUBLE PRECISION, "
+            "ADD COLUMN IF NOT EXISTS y2 DOUBLE PRECISION"
+        ))
+        conn.execute(text(
+            "UPDATE detected_objects SET "
+            "x1 = (bbox->>'x1')::float, y1 = (bbox->>'y1')::float, "
+            "x2 = (bbox->>'x2')::float, y2 = (bbox->>'y2')::float "
+            "WHERE bbox IS NOT NULL"
+        ))
+        conn.execute(text("ALTER TABLE detected_objects DROP COLUMN bbox"))
+        applied = True
+
+    if _column_type(conn, "faces", "bbox") is not None:
+        conn.execute(text(
+            "ALTER TABLE faces "
+            "ADD COLUMN IF NOT EXISTS x DOUBLE PRECISION, "
+            "ADD COLUMN IF NOT EXISTS y DOUBLE PRECISION, "
+            "ADD COLUMN IF NOT EXISTS width DOUBLE PRECISION, "
+            "ADD COLUMN IF NOT EXISTS height DOUBLE PRECISION"
+        ))
+        conn.execute(text(
+            "UPDATE faces SET "
+            "x = (bbox->>'x')::float, y = (bbox->>'y')::float, "
+            "width = (bbox->>'width')::float, height = (bbox->>'height')::float"
+        ))
+        conn.execute(text(
+            "ALTER TABLE faces "
+            "ALTER COLUMN x SET NOT NULL, ALTER COLUMN y SET NOT NULL, "
+            "ALTER COLUMN width SET NOT NULL, ALTER COLUMN height SET NOT NULL, "
+            "DROP COLUMN bbox"
+        ))
+        applied = True
+
+    return applied
+
+
+def migrate_query_indexes(conn) -> bool:
+    """Create composite indexes for gallery and tag-search queries."""
+    exists = conn.execute(text(
+        "SELECT to_regclass('idx_photos_state_created') IS NOT NULL "
+        "AND to_regclass('idx_photo_tags_tag_photo') IS NOT NULL"
+    )).scalar()
+    if exists:
+        return False
+
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS idx_photos_state_created ON photos (state, created_at)"
+    ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS idx_photo_tags_tag_photo ON photo_tags (tag, photo_id)"
+    ))
+    # Superseded by the (tag, photo_id) index
+    conn.execute(text("DROP INDEX IF EXISTS idx_photo_tags_tag"))
+    return True
+
+
+def migrate_photo_state_to_smallint(conn) -> bool:
+    """Convert photos.state from the photostate ENUM to SMALLINT codes."""
+    if _column_type(conn, "photos", "state") != "USER-DEFINED":
+        return False
+
+    # The ENUM stored member names (e.g. 'COMPLETED')
+    cases = " ".join(
+        f"WHEN '{state.name}' THEN {code}" for state, code in PHOTO_STATE_CODES.items()
+    )
+    conn.execute(text(
+        f"ALTER TABLE photos ALTER COLUMN state TYPE SMALLINT "
+        f"USING CASE state::text {cases} END"
+    ))
+    conn.execute(text("DROP TYPE IF EXISTS photostate"))
+    return True
+
+
+def migrate_completed_photos_index(conn) -> bool:
+    """Create the partial indexes used by search and the gallery for completed photos."""
+    exists = conn.execute(text(
+        "SELECT to_regclass('idx_photos_completed') IS NOT NULL "
+        "AND to_regclass('idx_photos_completed_gallery') IS NOT NULL"
+    )).scalar()
+    if exists:
+        return False
+
+    completed = PHOTO_STATE_CODES[PhotoState.COMPLETED]
+    conn.execute(text(
+        f"CREATE INDEX IF NOT EXISTS idx_photos_completed ON photos (id, created_at) "
+        f"WHERE state = {completed}"
+    ))
+    conn.execute(text(
+        f"CREATE INDEX IF NOT EXISTS idx_photos_completed_gallery ON photos (created_at, id) "
+        f"WHERE state = {completed}"
+    ))
+    return True
+
+
+def migrate_vector_indexes(conn) -> bool:
+    """Build HNSW indexes on the semantic and face embedding columns."""
+    exists = conn.execute(text(
+        "SELECT to_regclass('idx_sem_emb_hnsw') IS NOT NULL "
+        "AND to_regclass('idx_face_emb_hnsw') IS NOT NULL"
+    )).scalar()
+    if exists:
+        return False
+
+    # HNSW builds are much faster when the graph fits in maintenance memory
+    conn.execute(text("SET LOCAL maintenance_work_mem = '2GB'"))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS idx_sem_emb_hnsw ON semantic_embeddings "
+        "USING hnsw (embedding halfvec_ip_ops) WITH (m = 16, ef_construction = 64)"
+    ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS idx_face_emb_hnsw ON faces "
+        "USING hnsw (embedding halfvec_cosine_ops) WITH (m = 16, ef_construction = 64)"
+    ))
+    return True
+
+
+def migrate_face_embedding_to_halfvec(conn) -> bool:
+    """Store faces.embedding as halfvec(512); the HNSW step rebuilds its index."""
+    udt_name = conn.execute(text(
+        "SELECT udt_name FROM information_schema.columns "
+        "WHERE table_name = 'faces' AND column_name = 'embedding'"
+    )).scalar()
+    if udt_name != "vector":
+        return False
+
+    # The old index uses vector_cosine_ops and cannot survive the type change
+    conn.execute(text("DROP INDEX IF EXISTS idx_face_emb_hnsw"))
+    conn.execute(text(
+        "ALTER TABLE faces ALTER COLUMN embedding TYPE halfvec(512) "
+        "USING embedding::halfvec(512)"
+    ))
+    return True
+
+
+def migrate_semantic_embedding_to_halfvec(conn) -> bool:
+    """Store semantic_embeddings.embedding as halfvec(1024); the HNSW step rebuilds its index."""
+    udt_name = conn.execute(text(
+        "SELECT udt_name FROM information_schema.columns "
+        "WHERE table_name = 'semantic_embeddings' AND column_name = 'embedding'"
+    )).scalar()
+    if udt_name != "vector":
+        return False
+
+    conn.execute(text("DROP INDEX IF EXISTS idx_sem_emb_hnsw"))
+    conn.execute(text(
+        "ALTER TABLE semantic_embeddings ALTER COLUMN embedding TYPE halfvec(1024) "
+        "USING embedding::halfvec(1024)"
+    ))
+    return True
+
+
+def migrate_semantic_index_to_inner_product(conn) -> bool:
+    """Drop a cosine-ops semantic HNSW index; the HNSW step rebuilds it with halfvec_ip_ops."""
+    indexdef = conn.execute(text(
+        "SELECT indexdef FROM pg_indexes WHERE indexname = 'idx_sem_emb_hnsw'"
+    )).scalar()
+    if not indexdef or "halfvec_ip_ops" in indexdef:
+        return False
+
+    conn.execute(text("DROP INDEX idx_sem_emb_hnsw"))
+    return True
+
+
+def migrate_invalid_hash_index(conn) -> bool:
+    """Create the partial index used by fix_pdq_hashes.py to find malformed hashes."""
+    if conn.execute(text("SELECT to_regclass('idx_photo_hashes_invalid_length')")).scalar():
+        return False
+
+    conn.execute(text(
+        "CREATE INDEX idx_photo_hashes_invalid_length ON photo_hashes "
+        "(length(pdq_hash)) WHERE length(pdq_hash) <> 32"
+    ))
+    return True
+
+
+def migrate_tag_trigram_index(conn) -> bool:
+    """Create the pg_trgm GIN index used for substring tag search."""
+    if conn.execute(text("SELECT to_regclass('idx_photo_tags_tag_trgm')")).scalar():
+        return False
+
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    conn.execute(text(
+        "CREATE INDEX idx_photo_tags_tag_trgm ON photo_tags "
+        "USING gin (tag gin_trgm_ops)"
+    ))
+    return True
+
+
+MIGRATIONS = [
+    ("PDQ hashes stored as BYTEA", migrate_pdq_hash_to_bytea),
+    ("Bounding boxes stored as float columns", migrate_bbox_json_to_columns),
+    ("Composite query indexes", migrate_query_indexes),
+    ("Photo state stored as SMALLINT", migrate_photo_state_to_smallint),
+    ("Completed photos partial indexes", migrate_completed_photos_index),
+    ("Face embeddings stored as halfvec", migrate_face_embedding_to_halfvec),
+    ("Semantic embeddings stored as halfvec", migrate_semantic_embedding_to_halfvec),
+    ("Semantic index uses inner product", migrate_semantic_index_to_inner_product),
+    ("HNSW vector indexes", migrate_vector_indexes),
+    ("Malformed PDQ hash index", migrate_invalid_hash_index),
+    ("Trigram tag search index", migrate_tag_trigram_index),
+]
+
+
+def migrate():
+    """Apply all pending migrations, each in its own transaction."""
+    print("=" * 60)
+    print("Database Migration")
+    print("=" * 60)
+
+    engine = get_engine()
+
+    for description, step in MIGRATIONS:
+        with engine.begin() as conn:
+            applied = step(conn)
+
+        status = "applied" if applied else "already up to date"
+        print(f"✓ {description}: {status}")
+
+    print("\n✓ Migration complete!")
+
+
+if __name__ == "__main__":
+    migrate()
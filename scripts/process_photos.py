@@ -3,26 +3,96 @@ Script to scan photos directory and queue processing tasks.
 Scans for new photos, creates database records, and queues Celery tasks.
 """
 
+import argparse
+import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from celery import group
+from sqlalchemy import bindparam, insert, select, text
 from tqdm import tqdm
 from config import settings
-from models import Photo, PhotoState, get_session
-from utils import is_supported_format, get_file_size
+from models import Photo, PhotoState, get_engine, get_session
 from workers.tasks import process_single_image
 
+# Files checked and inserted per database round-trip
+RECORD_BATCH_SIZE = 5000
+
+# Tasks published per Celery group
+QUEUE_CHUNK_SIZE = 1000
+
+# Existing records for a batch of paths; built once so its SQL is compiled once
+_EXISTING_PHOTOS = select(Photo.id, Photo.file_path, Photo.state).where(
+    Photo.file_path.in_(bindparam('paths', expanding=True))
+)
+
+# Concurrent stat calls while scanning (hides network filesystem latency)
+STAT_WORKERS = 32
+
+# Case-insensitive extension match, e.g. {".jpg", ".heic", ...}
+_EXT_SET = frozenset(f".{ext}" for ext in settings.SUPPORTED_FORMATS)
+
+
+def _progress(iterable, desc: str):
+    """tqdm progress bar that throttles redraws and stays quiet when piped to logs."""
+    return tqdm(
+        iterable,
+        desc=desc,
+        disable=not sys.stderr.isatty(),
+        mininterval=0.5
+    )
+
+
+def _warm_up_connections():
+    """
+    Open the Postgres and broker connections in the background.
+    
+    Handshakes overlap with the directory scan and leave warm connections in
+    the pools. Errors are ignored here; the real calls report them.
+    """
+    def warm_database():
+        try:
+            with get_engine().connect() as conn:
+                conn.execute(text("SELECT 1"))
+        except Exception:
+            pass
+    
+    def warm_broker():
+        try:
+            conn = process_single_image.app.pool.acquire(block=True)
+            try:
+                conn.ensure_connection(max_retries=1)
+            finally:
+                conn.release()
+        except Exception:
+            pass
+    
+    for target in (warm_database, warm_broker):
+        threading.Thread(target=target, daemon=True).start()
+
+
+def _stat_entry(entry: os.DirEntry):
+    """Return (path, size, mtime) for a scanned file, or None if it cannot be read."""
+    try:
+        file_stat = entry.stat()
+    except OSError as e:
+        print(f"⚠️ Cannot stat {entry.path}: {e}")
+        return None
+    return (entry.path, file_stat.st_size, file_stat.st_mtime)
+
 
 def scan_photos_directory() -> list:
     """
     Scan photos directory for supported image files.
     
     Returns:
-        List of Path objects for image files
+        List of (absolute path, size in bytes, mtime) tuples for image files
     """
     photos_dir = settings.PHOTOS_DIR
     
@@ -32,23 +102,30 @@ def scan_photos_directory() -> list:
         return []
     
     print(f"Scanning directory: {photos_dir}")
-    print(f"Supported formats: {', '.join(settings.SUPPORTED_FORMATS)}")
+    print(f"Supported formats: {', '.join(sorted(settings.SUPPORTED_FORMATS))}")
     
-    image_files = []
+    candidates = []
     
-    # Recursively find all image files
-    for ext in settings.SUPPORTED_FORMATS:
-        pattern = f"**/*.{ext}"
-        found_files = list(photos_dir.rglob(pattern))
-        image_files.extend(found_files)
-        
-        # Also search for uppercase extensions
-        pattern_upper = f"**/*.{ext.upper()}"
-        found_files_upper = list(photos_dir.rglob(pattern_upper))
-        image_files.extend(found_files_upper)
+    # Walk the tree once with scandir, filtering by extension in memory
+    pending_dirs = [os.path.abspath(photos_dir)]
+    while pending_dirs:
+        try:
+            with os.scandir(pending_dirs.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending_dirs.append(entry.path)
+                        continue
+                    
+                    name = entry.name
+                    if name[name.rfind('.'):].lower() in _EXT_SET and entry.is_file():
+                        candidates.append(entry)
+        except OSError as e:
+            print(f"⚠️ Cannot read directory: {e}")
     
-    # Remove duplicates
-    image_files = list(set(image_files))
+    # Stat files concurrently (size and mtime are kept for record creation);
+    # on network filesystems each stat is latency-bound, not CPU-bound
+    with ThreadPoolExecutor(max_workers=STAT_WORKERS) as executor:
+        image_files = [meta for meta in executor.map(_stat_entry, candidates) if meta]
     
     print(f"✓ Found {len(image_files)} image files")
     
@@ -60,7 +137,7 @@ def create_photo_records(image_files: list) -> list:
     Create database records for new photos.
     
     Args:
-        image_files: List of Path objects
+        image_files: List of (absolute path, size, mtime) tuples from the scan
         
     Returns:
         List of photo IDs that need processing
@@ -72,42 +149,41 @@ def create_photo_records(image_files: list) -> list:
     print("\nCreating database records...")
     
     try:
-        for image_file in tqdm(image_files, desc="Creating records"):
-            file_path = str(image_file.absolute())
-            
-            # Check if already exists
-            existing = session.query(Photo).filter_by(file_path=file_path).first()
+        for start in _progress(range(0, len(image_files), RECORD_BATCH_SIZE), "Creating records"):
+            batch = image_files[start:start + RECORD_BATCH_SIZE]
             
-            if existing:
-                # Only queue if still pending or failed
-                if existing.state in (PhotoState.PENDING, PhotoState.FAILED):
-                    new_photos.append(existing.id)
-                else:
-                    skipped_photos += 1
-                continue
-            
-            # Create new photo record
-            try:
-                file_size = get_file_size(image_file)
-                
-                photo = Photo(
-                    file_path=file_path,
-                    filename=image_file.name,
-                    state=PhotoState.PENDING,
-                    file_size=file_size,
-                    created_at=datetime.fromtimestamp(image_file.stat().st_mtime)
+            # Check which files already exist in one query per batch
+            existing = {
+                file_path: (photo_id, state)
+                for photo_id, file_path, state in session.execute(
+                    _EXISTING_PHOTOS, {'paths': [file_path for file_path, _, _ in batch]}
                 )
+            }
+            
+            rows = []
+            for file_path, file_size, mtime in batch:
+                if file_path in existing:
+                    photo_id, state = existing[file_path]
+                    # Only queue if still pending or failed
+                    if state in (PhotoState.PENDING, PhotoState.FAILED):
+                        new_photos.append(photo_id)
+                    else:
+                        skipped_photos += 1
+                    continue
                 
-                session.add(photo)
-                session.flush()
-                
-                new_photos.append(photo.id)
-                
-            except Exception as e:
-                print(f"\n⚠️ Error creating record for {image_file.name}: {e}")
-                continue
-        
-        session.commit()
+                rows.append({
+                    'file_path': file_path,
+                    'filename': os.path.basename(file_path),
+                    'state': PhotoState.PENDING,
+                    'file_size': file_size,
+                    'created_at': datetime.fromtimestamp(mtime)
+                })
+            
+            # Insert the new records and get their IDs back in one round-trip
+            if rows:
+                new_photos.extend(session.scalars(insert(Photo).returning(Photo.id), rows))
+            
+            session.commit()
         
         print(f"\n✓ Created {len(new_photos)} new photo records")
         if skipped_photos > 0:
@@ -141,15 +217,16 @@ def queue_processing_tasks(photo_ids: list):
     queued = 0
     failed = 0
     
-    for photo_id in tqdm(photo_ids, desc="Queuing tasks"):
+    for start in _progress(range(0, len(photo_ids), QUEUE_CHUNK_SIZE), "Queuing tasks"):
+        chunk = photo_ids[start:start + QUEUE_CHUNK_SIZE]
         try:
-            # Queue the task
-            process_single_image.delay(photo_id)
-            queued += 1
+            # Publish the whole chunk over a single producer connection
+            group(process_single_image.s(photo_id) for photo_id in chunk).apply_async()
+            queued += len(chunk)
             
         except Exception as e:
-            print(f"\n⚠️ Failed to queue photo {photo_id}: {e}")
-            failed += 1
+            print(f"\n⚠️ Failed to queue photos {chunk[0]}..{chunk[-1]}: {e}")
+            failed += len(chunk)
             continue
     
     print(f"\n✓ Successfully queued {queued} tasks")
@@ -162,8 +239,20 @@ def queue_processing_tasks(photo_ids: list):
     print(f"  Celery workers: Check worker logs for detailed progress")
 
 
-def main():
+def parse_args(argv=None):
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Scan the photos directory and queue processing.")
+    parser.add_argument(
+        "-y", "--yes", action="store_true",
+        help="start processing without asking for confirmation"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main function."""
+    args = parse_args(argv)
+    
     print("=" * 60)
     print("AI Photos Management - Photo Processing Script")
     print("=" * 60)
@@ -175,6 +264,8 @@ def main():
     print(f"Redis: {settings.REDIS_URL}")
     print()
     
+    _warm_up_connections()
+    
     # Scan for photos
     image_files = scan_photos_directory()
     
@@ -186,7 +277,7 @@ def main():
     print(f"\nReady to process up to {len(image_files)} photos.")
     print("Note: Photos already processed will be skipped.")
     
-    response = input("\nContinue? (yes/no): ")
+    response = "yes" if args.yes else input("\nContinue? (yes/no): ")
     if response.lower() != "yes":
         print("Operation cancelled.")
         return 0
@@ -3,6 +3,8 @@ Seed script for initial categories and tag-to-category mappings.
 Populates the database with predefined categories and common tag mappings.
 """
 
+from sqlalchemy import func, insert, select
+
 from models import Category, TagCategoryMapping, get_session
 
 
@@ -81,14 +83,26 @@ def seed_categories():
         print("Starting database seeding...")
         print("=" * 60)
         
-        for category_name, category_data in SEED_DATA.items():
-            # Create category
-            category = Category(
-                name=category_name,
-                description=category_data["description"]
+        # Create all categories in one round-trip and map names to IDs
+        category_ids = {
+            name: category_id
+            for category_id, name in session.execute(
+                insert(Category).returning(Category.id, Category.name),
+                [
+                    {"name": name, "description": data["description"]}
+                    for name, data in SEED_DATA.items()
+                ]
             )
-            session.add(category)
-            session.flush()  # Flush to get the category ID
+        }
+        
+        # Load existing tag mappings once instead of querying per tag
+        mapped_tags = dict(
+            session.execute(select(TagCategoryMapping.tag, TagCategoryMapping.category_id)).all()
+        )
+        
+        mapping_rows = []
+        for category_name, category_data in SEED_DATA.items():
+            category_id = category_ids[category_name]
             
             print(f"\n✓ Created category: {category_name}")
             print(f"  Description: {category_data['description']}")
@@ -97,21 +111,21 @@ def seed_categories():
             # Create tag mappings
             tag_count = 0
             for tag in category_data["tags"]:
-                # Check if tag already exists
-                existing_mapping = session.query(TagCategoryMapping).filter_by(tag=tag).first()
-                if existing_mapping:
-                    print(f"  ⚠ Tag '{tag}' already mapped to category {existing_mapping.category_id}, skipping")
+                # Check if tag already exists (in the database or earlier in this seed)
+                if tag in mapped_tags:
+                    print(f"  ⚠ Tag '{tag}' already mapped to category {mapped_tags[tag]}, skipping")
                     continue
                 
-                mapping = TagCategoryMapping(
-                    tag=tag,
-                    category_id=category.id
-                )
-                session.add(mapping)
+                mapped_tags[tag] = category_id
+                mapping_rows.append({"tag": tag, "category_id": category_id})
                 tag_count += 1
             
             print(f"  ✓ Added {tag_count} tag mappings")
         
+        # Insert all tag mappings in a single executemany
+        if mapping_rows:
+            session.execute(insert(TagCategoryMapping), mapping_rows)
+        
         # Commit all changes
         session.commit()
         
@@ -128,9 +142,13 @@ def seed_categories():
         
         # Print categories with counts
         print("\nCategories:")
-        for category in session.query(Category).all():
-            count = session.query(TagCategoryMapping).filter_by(category_id=category.id).count()
-            print(f"  - {category.name}: {count} tags")
+        category_counts = session.query(
+            Category.name, func.count(TagCategoryMapping.id)
+        ).outerjoin(
+            TagCategoryMapping, TagCategoryMapping.category_id == Category.id
+        ).group_by(Category.id, Category.name).order_by(Category.id).all()
+        for category_name, count in category_counts:
+            print(f"  - {category_name}: {count} tags")
         
     except Exception as e:
         session.rollback()
@@ -140,7 +158,7 @@ def seed_categories():
         session.close()
 
 
-def clear_categories():
+def clear_categories(assume_yes: bool = False):
     """Clear all categories and tag mappings (use with caution!)."""
     session = get_session()
     
@@ -153,7 +171,7 @@ def clear_categories():
             return
         
         print(f"⚠ WARNING: This will delete {category_count} categories and {mapping_count} tag mappings!")
-        response = input("Are you sure you want to continue? (yes/no): ")
+        response = "yes" if assume_yes else input("Are you sure you want to continue? (yes/no): ")
         
         if response.lower() != "yes":
             print("Operation cancelled.")
@@ -175,10 +193,21 @@ def clear_categories():
 
 
 if __name__ == "__main__":
-    import sys
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Seed categories and tag mappings.")
+    parser.add_argument(
+        "--clear", action="store_true",
+        help="delete all categories and tag mappings instead of seeding"
+    )
+    parser.add_argument(
+        "-y", "--yes", action="store_true",
+        help="skip the confirmation prompt for --clear"
+    )
+    args = parser.parse_args()
     
-    if len(sys.argv) > 1 and sys.argv[1] == "--clear":
-        clear_categories()
+    if args.clear:
+        clear_categories(assume_yes=args.yes)
     else:
         seed_categories()
 
@@ -9,10 +9,28 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import tempfile
+import time
 from PIL import Image
+from sqlalchemy import insert, text
 from models import get_session, Photo, PhotoState, DetectedObject, PhotoTag, Category
 from config import settings
 
+TEST_PHOTO_ID = 888888
+
+
+# Data-modifying CTEs delete the children and the photo in one round trip;
+# foreign keys are checked at the end of the statement
+_DELETE_TEST_ROWS = text(
+    "WITH deleted_tags AS (DELETE FROM photo_tags WHERE photo_id = :photo_id), "
+    "deleted_objects AS (DELETE FROM detected_objects WHERE photo_id = :photo_id) "
+    "DELETE FROM photos WHERE id = :photo_id"
+)
+
+
+def _delete_test_rows(session):
+    """Delete the test photo together with its tags and detections."""
+    session.execute(_DELETE_TEST_ROWS, {"photo_id": TEST_PHOTO_ID})
+
 
 def setup_test_photo():
     """Create a test photo with thumbnail for testing."""
@@ -23,11 +41,8 @@ def setup_test_photo():
     session = get_session()
     
     try:
-        # Clean up existing test photo (delete related objects first due to foreign keys)
-        session.query(PhotoTag).filter_by(photo_id=888888).delete()
-        session.query(DetectedObject).filter_by(photo_id=888888).delete()
-        session.query(Photo).filter_by(id=888888).delete()
-        session.commit()
+        # Clean up existing test photo
+        _delete_test_rows(session)
         
         # Create test image
         test_img = Image.new('RGB', (800, 600), color='blue')
@@ -41,45 +56,45 @@ def setup_test_photo():
         settings.THUMBNAIL_DIR.mkdir(parents=True, exist_ok=True)
         thumbnail_path = settings.THUMBNAIL_DIR / "thumb_test_webapp_photo.jpg"
         
-        thumb_img = test_img.copy()
-        thumb_img.thumbnail((settings.THUMBNAIL_SIZE, settings.THUMBNAIL_SIZE), Image.Resampling.LANCZOS)
-        thumb_img.save(thumbnail_path, 'JPEG', quality=85)
-        
-        # Create photo record
-        photo = Photo(
-            id=888888,
-            file_path=str(original_path),
-            filename="test_webapp_photo.jpg",
-            thumbnail_path=str(thumbnail_path),  # Absolute path
-            state=PhotoState.COMPLETED,
-            width=800,
-            height=600,
-            file_size=original_path.stat().st_size
+        # test_img isn't reused, so resize it directly instead of copying first
+        width, height = test_img.size
+        scale = min(1.0, settings.THUMBNAIL_SIZE / max(width, height))
+        thumb_img = test_img.resize(
+            (max(1, round(width * scale)), max(1, round(height * scale))),
+            Image.Resampling.LANCZOS
         )
-        session.add(photo)
+        thumb_img.save(thumbnail_path, 'JPEG', quality=85)
         
-        # Add some test PhotoTags (unique tags)
-        tag1 = PhotoTag(photo_id=888888, tag="test_object_1", confidence=0.95)
-        tag2 = PhotoTag(photo_id=888888, tag="test_object_2", confidence=0.87)
-        session.add(tag1)
-        session.add(tag2)
+        # Create photo, tags and detections in one transaction
+        session.execute(insert(Photo), [{
+            'id': TEST_PHOTO_ID,
+            'file_path': str(original_path),
+            'filename': "test_webapp_photo.jpg",
+            'thumbnail_path': str(thumbnail_path),  # Absolute path
+            'state': PhotoState.COMPLETED,
+            'width': 800,
+            'height': 600,
+            'file_size': original_path.stat().st_size,
+        }])
         
-        # Add some test DetectedObjects (instances)
-        obj1 = DetectedObject(photo_id=888888, tag="test_object_1", confidence=0.95)
-        obj2 = DetectedObject(photo_id=888888, tag="test_object_2", confidence=0.87)
-        session.add(obj1)
-        session.add(obj2)
+        # Unique tags, and the detected instances behind them
+        test_objects = [
+            {'photo_id': TEST_PHOTO_ID, 'tag': "test_object_1", 'confidence': 0.95},
+            {'photo_id': TEST_PHOTO_ID, 'tag': "test_object_2", 'confidence': 0.87},
+        ]
+        session.execute(insert(PhotoTag), test_objects)
+        session.execute(insert(DetectedObject), test_objects)
         
         session.commit()
         
         print(f"✓ Test photo created:")
-        print(f"  ID: {photo.id}")
+        print(f"  ID: {TEST_PHOTO_ID}")
         print(f"  File: {original_path}")
         print(f"  Thumbnail: {thumbnail_path}")
         print(f"  Thumbnail exists: {thumbnail_path.exists()}")
         print(f"  Objects: 2")
         
-        return photo.id
+        return TEST_PHOTO_ID
         
     except Exception as e:
         print(f"✗ Failed to setup test photo: {e}")
@@ -99,7 +114,7 @@ def test_webapp_routes():
     
     from webapp.app import app
     
-    test_photo_id = 888888
+    test_photo_id = TEST_PHOTO_ID
     
     with app.test_client() as client:
         # Test 1: Index page
@@ -129,6 +144,17 @@ def test_webapp_routes():
                 print(f"  ✗ Thumbnail error: {response.status_code}")
                 print(f"  Response: {response.data.decode()[:200]}")
                 return False
+            
+            # A revalidation request should come back 304 with no body
+            response = client.get(
+                f'/thumbnail/{test_photo_id}',
+                headers={'If-Modified-Since': response.headers['Last-Modified']}
+            )
+            if response.status_code == 304 and not response.data:
+                print("  ✓ Cached thumbnail revalidates with 304")
+            else:
+                print(f"  ✗ Expected 304 for cached thumbnail, got {response.status_code}")
+                return False
         except Exception as e:
             print(f"  ✗ Thumbnail failed: {e}")
             import traceback
@@ -159,6 +185,21 @@ def test_webapp_routes():
             else:
                 print(f"  ✗ Search error: {response.status_code}")
                 return False
+            
+            # A second search for the same text should reuse the cached text
+            # embedding; a fresh query and a different mode keep the Redis
+            # result cache from answering either request
+            from workers import ai_models
+            query = f"embedding cache check {time.time_ns()}"
+            client.get(f'/search?q={query}&mode=semantic')
+            hits_before = ai_models._encode_text_cached.cache_info().hits
+            response = client.get(f'/search?q={query}&mode=hybrid')
+            hits_after = ai_models._encode_text_cached.cache_info().hits
+            print(f"  Embedding cache hits: {hits_before} -> {hits_after}")
+            if response.status_code != 200 or hits_after <= hits_before:
+                print("  ✗ Repeated search did not reuse the cached embedding")
+                return False
+            print("  ✓ Repeated search reused the cached embedding")
         except Exception as e:
             print(f"  ✗ Search failed: {e}")
             return False
@@ -193,9 +234,7 @@ def cleanup_test_photo():
     
     try:
         # Delete database records
-        session.query(PhotoTag).filter_by(photo_id=888888).delete()
-        session.query(DetectedObject).filter_by(photo_id=888888).delete()
-        session.query(Photo).filter_by(id=888888).delete()
+        _delete_test_rows(session)
         session.commit()
         
         # Delete files
@@ -2,6 +2,9 @@
 
 from collections import defaultdict
 
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
 from models import Category, TagCategoryMapping, get_session
 
 from scripts.seed_categories import SEED_DATA
@@ -18,18 +21,21 @@ def sync_categories_and_tags() -> None:
     mismatched_tags = defaultdict(list)
 
     try:
+        # Load existing seed categories in one query
+        existing_categories = {
+            category.name: category
+            for category in session.query(Category).filter(Category.name.in_(list(SEED_DATA)))
+        }
+
+        new_category_rows = []
         for category_name, category_data in SEED_DATA.items():
-            category = session.query(Category).filter_by(name=category_name).first()
+            category = existing_categories.get(category_name)
 
             if category is None:
-                category = Category(
-                    name=category_name,
-                    description=category_data["description"],
-                )
-                session.add(category)
-                session.flush()
-                created_categories += 1
-                print(f"✓ Created missing category '{category_name}'")
+                new_category_rows.append({
+                    "name": category_name,
+                    "description": category_data["description"],
+                })
             elif category.description != category_data["description"]:
                 category.description = category_data["description"]
                 updated_descriptions += 1
@@ -38,21 +44,50 @@ def sync_categories_and_tags() -> None:
                     f"'{category_name}' to match seed data"
                 )
 
-            for tag in category_data["tags"]:
-                mapping = session.query(TagCategoryMapping).filter_by(tag=tag).first()
-
-                if mapping is None:
-                    session.add(
-                        TagCategoryMapping(tag=tag, category_id=category.id)
-                    )
-                    created_mappings += 1
-                    continue
+        category_ids = {name: category.id for name, category in existing_categories.items()}
+        if new_category_rows:
+            inserted = session.execute(
+                insert(Category).returning(Category.id, Category.name),
+                new_category_rows,
+            )
+            for category_id, category_name in inserted:
+                category_ids[category_name] = category_id
+                created_categories += 1
+                print(f"✓ Created missing category '{category_name}'")
 
-                if mapping.category_id != category.id:
+        # The first category listing a tag wins, as with sequential inserts
+        desired_mappings = {}
+        for category_name, category_data in SEED_DATA.items():
+            for tag in category_data["tags"]:
+                desired_mappings.setdefault(tag, category_ids[category_name])
+
+        # The unique index on tag makes the insert idempotent server-side
+        if desired_mappings:
+            result = session.execute(
+                pg_insert(TagCategoryMapping)
+                .values([
+                    {"tag": tag, "category_id": category_id}
+                    for tag, category_id in desired_mappings.items()
+                ])
+                .on_conflict_do_nothing(index_elements=["tag"])
+            )
+            created_mappings = result.rowcount
+
+        mapped_categories = dict(
+            session.query(TagCategoryMapping.tag, TagCategoryMapping.category_id)
+            .filter(TagCategoryMapping.tag.in_(list(desired_mappings)))
+        )
+
+        matched_mappings = 0
+        for category_name, category_data in SEED_DATA.items():
+            category_id = category_ids[category_name]
+            for tag in category_data["tags"]:
+                if mapped_categories.get(tag) == category_id:
+                    matched_mappings += 1
+                else:
                     mismatched_tags[category_name].append(tag)
-                    continue
 
-                skipped_mappings += 1
+        skipped_mappings = matched_mappings - created_mappings
 
         session.commit()
 
@@ -4,7 +4,10 @@ Tests object recognition, category mapping, OCR, face detection,
 duplicate detection, and hybrid search.
 """
 
+import io
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 # Add parent directory to path
@@ -18,6 +21,40 @@ from services import hybrid_search, keyword_search, semantic_search
 from models import get_session, Category, TagCategoryMapping
 
 
+# Tests are independent (DB tests open their own sessions), so they run concurrently
+MAX_PARALLEL_TESTS = 4
+
+_thread_output = threading.local()
+
+
+class _ThreadBufferedStdout:
+    """sys.stdout stand-in that buffers each test thread's output separately."""
+    
+    def __init__(self, stream):
+        self._stream = stream
+    
+    def write(self, text: str) -> int:
+        buffer = getattr(_thread_output, 'buffer', None)
+        return (buffer or self._stream).write(text)
+    
+    def flush(self) -> None:
+        self._stream.flush()
+
+
+def _run_buffered(test_name: str, test_func) -> tuple:
+    """Run one test with its output buffered; returns (success, output)."""
+    _thread_output.buffer = io.StringIO()
+    try:
+        success = test_func()
+    except Exception as e:
+        print(f"\n✗ {test_name} crashed: {e}")
+        success = False
+    finally:
+        output = _thread_output.buffer.getvalue()
+        _thread_output.buffer = None
+    return success, output
+
+
 def test_detr_object_recognition():
     """Test DETR object recognition."""
     print("\n" + "=" * 60)
@@ -255,14 +292,23 @@ def main():
         ("Hybrid Search", test_hybrid_search),
     ]
     
-    results = {}
+    results = {test_name: False for test_name, _ in tests}
     
-    for test_name, test_func in tests:
-        try:
-            results[test_name] = test_func()
-        except Exception as e:
-            print(f"\n✗ {test_name} crashed: {e}")
-            results[test_name] = False
+    # Each test's output is printed as one block when it completes
+    real_stdout = sys.stdout
+    sys.stdout = _ThreadBufferedStdout(real_stdout)
+    try:
+        with ThreadPoolExecutor(max_workers=MAX_PARALLEL_TESTS) as executor:
+            futures = {
+                executor.submit(_run_buffered, test_name, test_func): test_name
+                for test_name, test_func in tests
+            }
+            for future in as_completed(futures):
+                success, output = future.result()
+                results[futures[future]] = success
+                print(output, end='')
+    finally:
+        sys.stdout = real_stdout
     
     # Summary
     print("\n" + "=" * 60)
@@ -4,6 +4,7 @@ from .search_service import (
     hybrid_search,
     keyword_search,
     semantic_search,
+    fused_search,
     get_photo_details,
     reciprocal_rank_fusion
 )
@@ -12,6 +13,7 @@ __all__ = [
     "hybrid_search",
     "keyword_search",
     "semantic_search",
+    "fused_search",
     "get_photo_details",
     "reciprocal_rank_fusion",
 ]
@@ -2,22 +2,67 @@
 Hybrid search service implementing keyword search, semantic vector search, and RRF fusion.
 """
 
+import hashlib
+import json
 import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 
-from sqlalchemy import func, or_, and_, text
-from sqlalchemy.orm import Session
+import numpy as np
+from sqlalchemy import (
+    Float, Integer, Select, column, exists, func, or_, select, text, union_all, values
+)
+from sqlalchemy.orm import Session, load_only, selectinload
 
 from models import (
     Photo, DetectedObject, PhotoTag, OCRText, SemanticEmbedding,
     Category, PhotoState, get_session
 )
 from workers import ai_models
+from utils import cache_get_json, cache_set_json
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+# pgvector rejects hnsw.ef_search values above this
+HNSW_MAX_EF_SEARCH = 1000
+
+# Built once so SQLAlchemy's compiled cache serves every search
+_HNSW_SETTINGS = text("SELECT set_config('hnsw.ef_search', :ef_search, true)")
+_HNSW_SETTINGS_ITERATIVE = text(
+    "SELECT set_config('hnsw.ef_search', :ef_search, true), "
+    "set_config('hnsw.iterative_scan', 'strict_order', true)"
+)
+
+# Characters of OCR text shown with each search result
+OCR_SNIPPET_LENGTH = 200
+
+# Category names change rarely; their ids are cached for this many seconds
+CATEGORY_CACHE_TTL = 60.0
+
+# (expires_at, category name -> id); the categories table is a handful of rows
+_category_id_cache: Tuple[float, Dict[str, int]] = (0.0, {})
+
+# Query embeddings are computed here so the model forward pass overlaps
+# with the request's own database round trips
+_embedding_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='query-embedding')
+
+
+def _embed_query(query: str) -> np.ndarray:
+    """Embed a query, raising where generate_text_embedding would return zeros."""
+    embedding = ai_models.generate_text_embedding(query)
+    # A real OpenCLIP embedding is unit-norm; all zeros marks a failed encode
+    if not embedding.any():
+        raise RuntimeError("Text embedding failed")
+    return embedding
+
+
+def _submit_text_embedding(query: str) -> Future:
+    """Start embedding the query in the background; .result() raises if encoding failed."""
+    return _embedding_executor.submit(_embed_query, query)
+
 
 def reciprocal_rank_fusion(
     keyword_results: List[Tuple[int, float]],
@@ -33,32 +78,183 @@ def reciprocal_rank_fusion(
         k: RRF constant (default: 60)
         
     Returns:
-        List of (photo_id, rrf_score) sorted by score descending
+        List of (photo_id, rrf_score) sorted by score descending, ties by photo_id
     """
-    # Create rank dictionaries
-    keyword_ranks = {photo_id: rank for rank, (photo_id, _) in enumerate(keyword_results, 1)}
-    semantic_ranks = {photo_id: rank for rank, (photo_id, _) in enumerate(semantic_results, 1)}
+    keyword_ids = np.array([photo_id for photo_id, _ in keyword_results], dtype=np.int64)
+    semantic_ids = np.array([photo_id for photo_id, _ in semantic_results], dtype=np.int64)
     
-    # Combine all unique photo IDs
-    all_photo_ids = set(keyword_ranks.keys()) | set(semantic_ranks.keys())
+    # Sorted unique photo IDs from both rankings
+    photo_ids = np.union1d(keyword_ids, semantic_ids)
+    rrf_scores = np.zeros(len(photo_ids))
     
-    # Calculate RRF scores
-    rrf_scores = {}
-    for photo_id in all_photo_ids:
-        score = 0.0
-        
-        if photo_id in keyword_ranks:
-            score += 1.0 / (k + keyword_ranks[photo_id])
-        
-        if photo_id in semantic_ranks:
-            score += 1.0 / (k + semantic_ranks[photo_id])
-        
-        rrf_scores[photo_id] = score
+    # Each ranking contributes 1 / (k + rank) to the photos it contains
+    for ranked_ids in (keyword_ids, semantic_ids):
+        ranks = np.arange(1, len(ranked_ids) + 1)
+        rrf_scores[np.searchsorted(photo_ids, ranked_ids)] += 1.0 / (k + ranks)
     
-    # Sort by score descending
-    sorted_results = sorted(rrf_scores.items(), key=lambda x: x[1], reverse=True)
+    # Stable sort on the negated score keeps ties in photo_id order
+    order = np.argsort(-rrf_scores, kind='stable')
     
-    return sorted_results
+    return list(zip(photo_ids[order].tolist(), rrf_scores[order].tolist()))
+
+
+def _category_name_to_id(session: Session) -> Dict[str, int]:
+    """Return the category name -> id map, reloaded at most every CATEGORY_CACHE_TTL seconds."""
+    global _category_id_cache
+    
+    now = time.monotonic()
+    expires_at, name_to_id = _category_id_cache
+    if expires_at <= now:
+        name_to_id = dict(session.query(Category.name, Category.id))
+        _category_id_cache = (now + CATEGORY_CACHE_TTL, name_to_id)
+    return name_to_id
+
+
+def _category_ids(session: Session, categories: Optional[List[str]]) -> List[int]:
+    """Resolve category names to ids (empty if no categories requested or none exist)."""
+    if not categories:
+        return []
+    
+    name_to_id = _category_name_to_id(session)
+    return [name_to_id[name] for name in set(categories) if name in name_to_id]
+
+
+def _like_pattern(query: str) -> str:
+    """Build an ILIKE substring pattern, escaping the query's own wildcards."""
+    escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+def _filter_photos(stmt: Select, date_from: Optional[datetime], date_to: Optional[datetime]) -> Select:
+    """Restrict a statement joined to Photo to completed photos within the date range."""
+    stmt = stmt.where(Photo.state == PhotoState.COMPLETED)
+    if date_from:
+        stmt = stmt.where(Photo.created_at >= date_from)
+    if date_to:
+        stmt = stmt.where(Photo.created_at <= date_to)
+    return stmt
+
+
+def _keyword_select(
+    query: str,
+    limit: int,
+    category_ids: List[int],
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None
+) -> Select:
+    """Build the keyword ranking: (photo_id, score) from OCR text and tags, best first."""
+    # websearch syntax lets users quote phrases, use "or" and exclude words with "-"
+    ts_query = func.websearch_to_tsquery('english', query)
+    
+    # OCR text matches, ranked by ts_rank
+    ocr_matches = select(
+        OCRText.photo_id.label('photo_id'),
+        func.ts_rank(OCRText.ts_vector, ts_query).label('score')
+    ).where(
+        OCRText.ts_vector.op('@@')(ts_query)
+    )
+    
+    # Tag matches, ranked by the best matching tag's confidence; the
+    # substring ILIKE is answered by the idx_photo_tags_tag_trgm GIN index
+    tag_matches = select(
+        PhotoTag.photo_id.label('photo_id'),
+        func.max(PhotoTag.confidence).label('score')
+    ).where(
+        PhotoTag.tag.ilike(_like_pattern(query), escape='\\')
+    ).group_by(PhotoTag.photo_id)
+    
+    if category_ids:
+        tag_matches = tag_matches.where(PhotoTag.category_id.in_(category_ids))
+    
+    # Sum scores for photos appearing in both
+    matches = union_all(ocr_matches, tag_matches).subquery('keyword_matches')
+    score = func.sum(matches.c.score)
+    
+    stmt = select(
+        matches.c.photo_id,
+        score.label('score')
+    ).join(Photo, Photo.id == matches.c.photo_id)
+    
+    return _filter_photos(stmt, date_from, date_to).group_by(
+        matches.c.photo_id
+    ).order_by(score.desc()).limit(limit)
+
+
+def _configure_vector_search(session: Session, limit: int) -> None:
+    """Set transaction-local HNSW parameters for a nearest-neighbour query in one round trip."""
+    # Keep scanning the index when filters discard candidates (pgvector >= 0.8)
+    statement = _HNSW_SETTINGS_ITERATIVE if settings.HNSW_ITERATIVE_SCAN else _HNSW_SETTINGS
+    
+    # Size the HNSW candidate list to the requested limit
+    session.execute(
+        statement,
+        {'ef_search': str(min(HNSW_MAX_EF_SEARCH, max(settings.HNSW_EF_SEARCH, 2 * limit)))}
+    )
+
+
+def _filter_categories(stmt: Select, photo_id_column, category_ids: List[int]) -> Select:
+    """Restrict a statement to photos with a tag in one of the categories."""
+    if not category_ids:
+        return stmt
+    # Correlated EXISTS lets PostgreSQL stop at the first matching tag per candidate
+    return stmt.where(exists().where(
+        PhotoTag.photo_id == photo_id_column,
+        PhotoTag.category_id.in_(category_ids)
+    ))
+
+
+def _prefer_exact_scan(
+    session: Session,
+    category_ids: List[int],
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None
+) -> bool:
+    """
+    Decide whether filters are selective enough to skip the HNSW index.
+    
+    When few photos pass the category/date filters, computing the distance
+    for just those photos is cheaper than walking the HNSW graph and
+    discarding most of the candidates it yields.
+    """
+    if not (category_ids or date_from or date_to):
+        return False
+    
+    max_rows = settings.SEMANTIC_EXACT_SCAN_MAX
+    candidates = _filter_photos(select(Photo.id), date_from, date_to)
+    candidates = _filter_categories(candidates, Photo.id, category_ids).limit(max_rows + 1).subquery()
+    count = session.execute(select(func.count()).select_from(candidates)).scalar()
+    return count <= max_rows
+
+
+def _semantic_select(
+    query_embedding,
+    limit: int,
+    category_ids: List[int],
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    exact: bool = False
+) -> Select:
+    """
+    Build the semantic ranking: (photo_id, distance), nearest first.
+    
+    With exact=True the filters are applied first and distances are
+    computed only for the photos that pass them, bypassing the HNSW index.
+    """
+    # Embeddings are unit length, so the negative inner product (<#>) orders
+    # like cosine distance without computing norms
+    negative_inner_product = SemanticEmbedding.embedding.max_inner_product(query_embedding)
+    distance = (1 + negative_inner_product).label('distance')
+    
+    stmt = select(
+        SemanticEmbedding.photo_id,
+        distance
+    ).join(Photo, SemanticEmbedding.photo_id == Photo.id)
+    stmt = _filter_photos(stmt, date_from, date_to)
+    stmt = _filter_categories(stmt, SemanticEmbedding.photo_id, category_ids)
+    
+    # Only the raw operator expression matches the HNSW index; ordering by
+    # the derived distance forces an exact scan over the filtered rows
+    return stmt.order_by(distance if exact else negative_inner_product).limit(limit)
 
 
 def keyword_search(
@@ -84,82 +280,13 @@ def keyword_search(
         List of (photo_id, relevance_score) sorted by relevance
     """
     try:
-        # Create ts_query from search query
-        ts_query = func.plainto_tsquery('english', query)
-        
-        # Build base query for OCR text search
-        ocr_query = session.query(
-            OCRText.photo_id,
-            func.ts_rank(OCRText.ts_vector, ts_query).label('rank')
-        ).filter(
-            OCRText.ts_vector.op('@@')(ts_query)
-        )
-        
-        # Build base query for tag search
-        tag_query = session.query(
-            PhotoTag.photo_id,
-            PhotoTag.confidence.label('rank')
-        ).filter(
-            PhotoTag.tag.ilike(f'%{query}%')
+        stmt = _keyword_select(
+            query, limit, _category_ids(session, categories), date_from, date_to
         )
+        results = [(photo_id, float(score)) for photo_id, score in session.execute(stmt)]
         
-        # Apply category filter to tag query
-        if categories:
-            category_ids = session.query(Category.id).filter(
-                Category.name.in_(categories)
-            ).all()
-            category_ids = [cid[0] for cid in category_ids]
-            
-            if category_ids:
-                tag_query = tag_query.filter(PhotoTag.category_id.in_(category_ids))
-        
-        # Combine OCR and tag results
-        ocr_results = {photo_id: rank for photo_id, rank in ocr_query.all()}
-        tag_results = {photo_id: rank for photo_id, rank in tag_query.all()}
-        
-        # Merge results (sum scores for photos appearing in both)
-        all_photo_ids = set(ocr_results.keys()) | set(tag_results.keys())
-        combined_scores = {}
-        
-        for photo_id in all_photo_ids:
-            score = 0.0
-            if photo_id in ocr_results:
-                score += float(ocr_results[photo_id])
-            if photo_id in tag_results:
-                score += float(tag_results[photo_id])
-            combined_scores[photo_id] = score
-        
-        # Filter by date and state
-        photo_ids_to_check = list(combined_scores.keys())
-        
-        photos_query = session.query(Photo.id).filter(
-            Photo.id.in_(photo_ids_to_check),
-            Photo.state == PhotoState.COMPLETED
-        )
-        
-        if date_from:
-            photos_query = photos_query.filter(Photo.created_at >= date_from)
-        if date_to:
-            photos_query = photos_query.filter(Photo.created_at <= date_to)
-        
-        valid_photo_ids = {pid[0] for pid in photos_query.all()}
-        
-        # Filter results to only valid photos
-        filtered_scores = {
-            photo_id: score
-            for photo_id, score in combined_scores.items()
-            if photo_id in valid_photo_ids
-        }
-        
-        # Sort by score and limit
-        sorted_results = sorted(
-            filtered_scores.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:limit]
-        
-        logger.info(f"Keyword search found {len(sorted_results)} results")
-        return sorted_results
+        logger.info(f"Keyword search found {len(results)} results")
+        return results
         
     except Exception as e:
         logger.error(f"Keyword search error: {e}")
@@ -189,43 +316,17 @@ def semantic_search(
         List of (photo_id, distance) sorted by similarity (lower distance = more similar)
     """
     try:
-        # Generate query embedding
-        query_embedding = ai_models.generate_text_embedding(query)
-        
-        # Build base query for vector similarity search
-        embedding_query = session.query(
-            SemanticEmbedding.photo_id,
-            SemanticEmbedding.embedding.cosine_distance(query_embedding).label('distance')
-        ).join(Photo, SemanticEmbedding.photo_id == Photo.id).filter(
-            Photo.state == PhotoState.COMPLETED
+        # Generate query embedding while the category lookup runs
+        embedding_future = _submit_text_embedding(query)
+        category_ids = _category_ids(session, categories)
+        exact = _prefer_exact_scan(session, category_ids, date_from, date_to)
+        if not exact:
+            _configure_vector_search(session, limit)
+        
+        stmt = _semantic_select(
+            embedding_future.result(), limit, category_ids, date_from, date_to, exact
         )
-        
-        # Apply date filters
-        if date_from:
-            embedding_query = embedding_query.filter(Photo.created_at >= date_from)
-        if date_to:
-            embedding_query = embedding_query.filter(Photo.created_at <= date_to)
-        
-        # Apply category filter
-        if categories:
-            category_ids = session.query(Category.id).filter(
-                Category.name.in_(categories)
-            ).all()
-            category_ids = [cid[0] for cid in category_ids]
-            
-            if category_ids:
-                # Filter photos that have tags in these categories
-                photo_ids_in_categories = session.query(PhotoTag.photo_id).filter(
-                    PhotoTag.category_id.in_(category_ids)
-                ).distinct().all()
-                photo_ids_in_categories = [pid[0] for pid in photo_ids_in_categories]
-                
-                embedding_query = embedding_query.filter(
-                    SemanticEmbedding.photo_id.in_(photo_ids_in_categories)
-                )
-        
-        # Order by distance and limit
-        results = embedding_query.order_by('distance').limit(limit).all()
+        results = session.execute(stmt).all()
         
         logger.info(f"Semantic search found {len(results)} results")
         return [(photo_id, float(distance)) for photo_id, distance in results]
@@ -235,6 +336,172 @@ def semantic_search(
         return []
 
 
+def _fused_ranking(
+    session: Session,
+    query: str,
+    limit: Optional[int],
+    offset: int = 0,
+    categories: Optional[List[str]] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None
+) -> Tuple[List[Tuple[int, float]], int]:
+    """Run the single-query RRF fusion behind fused_search; errors propagate."""
+    top_k = settings.SEARCH_TOP_K
+    embedding_future = _submit_text_embedding(query)
+    category_ids = _category_ids(session, categories)
+    exact = _prefer_exact_scan(session, category_ids, date_from, date_to)
+    if not exact:
+        _configure_vector_search(session, top_k)
+    query_embedding = embedding_future.result()
+    
+    keyword_hits = _keyword_select(query, top_k, category_ids, date_from, date_to).subquery('keyword_hits')
+    semantic_hits = _semantic_select(
+        query_embedding, top_k, category_ids, date_from, date_to, exact
+    ).subquery('semantic_hits')
+    
+    ranks = union_all(
+        select(
+            keyword_hits.c.photo_id,
+            func.row_number().over(order_by=keyword_hits.c.score.desc()).label('rank')
+        ),
+        select(
+            semantic_hits.c.photo_id,
+            func.row_number().over(order_by=semantic_hits.c.distance).label('rank')
+        )
+    ).subquery('ranks')
+    
+    rrf_score = func.sum(1.0 / (settings.RRF_K + ranks.c.rank))
+    stmt = select(
+        ranks.c.photo_id,
+        rrf_score.label('score'),
+        func.count().over().label('total')
+    ).group_by(ranks.c.photo_id).order_by(
+        rrf_score.desc(), ranks.c.photo_id
+    ).limit(limit).offset(offset)
+    
+    rows = session.execute(stmt).all()
+    total = rows[0].total if rows else 0
+    return [(row.photo_id, float(row.score)) for row in rows], total
+
+
+def _keyword_ranking(
+    session: Session,
+    query: str,
+    categories: Optional[List[str]],
+    date_from: Optional[datetime],
+    date_to: Optional[datetime]
+) -> List[Tuple[int, float]]:
+    """Rank keyword hits with RRF weights; the degraded hybrid ranking when fusion fails."""
+    keyword_results = keyword_search(
+        session, query, settings.SEARCH_TOP_K, categories, date_from, date_to
+    )
+    return [
+        (photo_id, 1.0 / (settings.RRF_K + rank))
+        for rank, (photo_id, _) in enumerate(keyword_results, start=1)
+    ]
+
+
+def fused_search(
+    session: Session,
+    query: str,
+    limit: Optional[int],
+    offset: int = 0,
+    categories: Optional[List[str]] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None
+) -> Tuple[List[Tuple[int, float]], int]:
+    """
+    Run keyword and semantic search and fuse them with RRF in a single SQL query.
+    
+    Only the requested page crosses the wire; the total number of fused
+    results is computed alongside it with a window function.
+    
+    Args:
+        session: Database session
+        query: Search query string
+        limit: Page size (None returns every fused result)
+        offset: Number of fused results to skip
+        categories: Optional list of category names to filter
+        date_from: Optional start date filter
+        date_to: Optional end date filter
+        
+    Returns:
+        Tuple of ([(photo_id, rrf_score)] for the page, total fused results)
+    """
+    try:
+        return _fused_ranking(session, query, limit, offset, categories, date_from, date_to)
+        
+    except Exception as e:
+        # Degrade to keyword-only ranking rather than failing the whole search
+        logger.error(f"Fused search error: {e}")
+        session.rollback()
+        ranked = _keyword_ranking(session, query, categories, date_from, date_to)
+        end = None if limit is None else offset + limit
+        return ranked[offset:end], len(ranked)
+
+
+def _search_cache_key(
+    query: str,
+    mode: str,
+    categories: Optional[List[str]],
+    date_from: Optional[datetime],
+    date_to: Optional[datetime]
+) -> str:
+    """Build the Redis key identifying a search's full ranked result list."""
+    params = [
+        ' '.join(query.split()).lower(),
+        mode,
+        sorted(categories or []),
+        date_from.isoformat() if date_from else None,
+        date_to.isoformat() if date_to else None,
+    ]
+    return 'search:' + hashlib.sha1(json.dumps(params).encode()).hexdigest()
+
+
+def _ranked_results(
+    session: Session,
+    query: str,
+    mode: str,
+    categories: Optional[List[str]],
+    date_from: Optional[datetime],
+    date_to: Optional[datetime]
+) -> List[Tuple[int, float]]:
+    """
+    Return the full ranked (photo_id, score) list for a search.
+    
+    The list is cached in Redis for SEARCH_CACHE_TTL seconds, so paging
+    through results slices the cached ranking instead of re-running the
+    keyword and semantic retrieval for every page.
+    """
+    cache_key = _search_cache_key(query, mode, categories, date_from, date_to)
+    cached = cache_get_json(cache_key)
+    if cached is not None:
+        return [(photo_id, score) for photo_id, score in cached]
+    
+    if mode in ('keyword', 'semantic'):
+        search = keyword_search if mode == 'keyword' else semantic_search
+        results = search(
+            session, query, settings.SEARCH_TOP_K,
+            categories, date_from, date_to
+        )
+    else:  # hybrid mode: RRF fusion runs in the database
+        try:
+            results, _ = _fused_ranking(
+                session, query, None, 0,
+                categories, date_from, date_to
+            )
+        except Exception as e:
+            # Serve the keyword-only ranking, but never cache a degraded result
+            logger.error(f"Fused search error: {e}")
+            session.rollback()
+            return _keyword_ranking(session, query, categories, date_from, date_to)
+    
+    # Empty lists are not cached: the searches also return [] on errors
+    if results:
+        cache_set_json(cache_key, results, settings.SEARCH_CACHE_TTL)
+    return results
+
+
 def hybrid_search(
     query: str,
     mode: str = 'hybrid',
@@ -264,74 +531,60 @@ def hybrid_search(
     session = get_session()
     
     try:
-        # Perform searches based on mode
-        if mode == 'keyword':
-            keyword_results = keyword_search(
-                session, query, settings.SEARCH_TOP_K,
-                categories, date_from, date_to
-            )
-            final_results = keyword_results
-            
-        elif mode == 'semantic':
-            semantic_results = semantic_search(
-                session, query, settings.SEARCH_TOP_K,
-                categories, date_from, date_to
-            )
-            final_results = semantic_results
-            
-        else:  # hybrid mode
-            keyword_results = keyword_search(
-                session, query, settings.SEARCH_TOP_K,
-                categories, date_from, date_to
-            )
-            semantic_results = semantic_search(
-                session, query, settings.SEARCH_TOP_K,
-                categories, date_from, date_to
-            )
-            
-            # Apply RRF fusion
-            final_results = reciprocal_rank_fusion(
-                keyword_results,
-                semantic_results,
-                k=settings.RRF_K
-            )
-        
-        # Apply pagination
         start_idx = (page - 1) * page_size
-        end_idx = start_idx + page_size
-        paginated_photo_ids = [photo_id for photo_id, _ in final_results[start_idx:end_idx]]
         
-        # Fetch photo details
-        photos = session.query(Photo).filter(Photo.id.in_(paginated_photo_ids)).all()
+        ranked_results = _ranked_results(
+            session, query, mode, categories, date_from, date_to
+        )
+        total = len(ranked_results)
+        page_results = ranked_results[start_idx:start_idx + page_size]
         
-        # Create results with metadata
+        # Create results with metadata, in ranked order
         results = []
-        for photo in photos:
-            # Get matched tags
-            matched_tags = session.query(PhotoTag.tag).filter(
-                PhotoTag.photo_id == photo.id
-            ).limit(5).all()
-            matched_tags = [tag[0] for tag in matched_tags]
-            
-            # Get OCR snippet if available
-            ocr_text = session.query(OCRText.extracted_text).filter(
-                OCRText.photo_id == photo.id
-            ).first()
-            ocr_snippet = ocr_text[0][:200] + "..." if ocr_text and ocr_text[0] else None
+        if page_results:
+            # Join the page's ranking as a VALUES list so rows arrive in rank order
+            page_ranks = values(
+                column('photo_id', Integer), column('rank', Integer), column('score', Float),
+                name='page_ranks'
+            ).data([
+                (photo_id, rank, score)
+                for rank, (photo_id, score) in enumerate(page_results, 1)
+            ])
             
-            # Get score for this photo
-            score = next((score for pid, score in final_results if pid == photo.id), 0.0)
+            # Photos, scores and OCR snippets in one query, tags in a second;
+            # only the snippet of long OCR documents crosses the wire
+            rows = session.query(
+                Photo,
+                page_ranks.c.score,
+                func.substr(OCRText.extracted_text, 1, OCR_SNIPPET_LENGTH)
+            ).join(
+                page_ranks, Photo.id == page_ranks.c.photo_id
+            ).outerjoin(
+                OCRText, OCRText.photo_id == Photo.id
+            ).options(
+                # Callers render id/filename/date; the session closes before they
+                # run, so everything they touch is loaded here, never lazily
+                load_only(Photo.id, Photo.filename, Photo.created_at),
+                selectinload(Photo.photo_tags).load_only(PhotoTag.photo_id, PhotoTag.tag)
+            ).order_by(page_ranks.c.rank).all()
             
-            results.append({
-                'photo': photo,
-                'score': score,
-                'matched_tags': matched_tags,
-                'ocr_snippet': ocr_snippet
-            })
+            for photo, score, ocr_text in rows:
+                # Get matched tags
+                matched_tags = [photo_tag.tag for photo_tag in photo.photo_tags[:5]]
+                
+                # Get OCR snippet if available
+                ocr_snippet = ocr_text + "..." if ocr_text else None
+                
+                results.append({
+                    'photo': photo,
+                    'score': score,
+                    'matched_tags': matched_tags,
+                    'ocr_snippet': ocr_snippet
+                })
         
         return {
             'results': results,
-            'total': len(final_results),
+            'total': total,
             'page': page,
             'page_size': page_size,
             'mode': mode
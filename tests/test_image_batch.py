@@ -0,0 +1,46 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from PIL import Image
+
+from config import settings
+from utils.image_utils import ImageConversionError, process_images_for_storage_batch
+
+
+class ProcessImagesBatchTestCase(unittest.TestCase):
+    """Unit tests for the process-pool batch wrapper around process_image_for_storage."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self._tmp.name)
+        # Worker processes are forked, so they see the patched thumbnail directory
+        patcher = patch.object(settings, "THUMBNAIL_DIR", self.tmp_path / "thumbnails")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self._tmp.cleanup)
+
+    def test_empty_input_returns_empty_list(self):
+        self.assertEqual(process_images_for_storage_batch([]), [])
+
+    def test_results_keep_input_order_with_error_slots(self):
+        jpeg_path = self.tmp_path / "first.jpg"
+        Image.new("RGB", (64, 32), color="red").save(jpeg_path, "JPEG")
+        broken_path = self.tmp_path / "broken.jpg"
+        broken_path.write_bytes(b"not an image")
+        png_path = self.tmp_path / "third.png"
+        Image.new("RGB", (16, 48), color="blue").save(png_path, "PNG")
+
+        results = process_images_for_storage_batch([jpeg_path, broken_path, png_path], workers=2)
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0]["original_path"], jpeg_path)
+        self.assertEqual((results[0]["width"], results[0]["height"]), (64, 32))
+        self.assertIsInstance(results[1], ImageConversionError)
+        self.assertEqual(results[2]["processed_path"], png_path.with_suffix(".jpg"))
+        self.assertEqual((results[2]["width"], results[2]["height"]), (16, 48))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,7 @@
 import unittest
 
 from config import settings
-from workers.object_filtering import filter_detected_objects
+from workers.object_filtering import deduplicate_tags, filter_detected_objects
 
 
 class FilterDetectedObjectsTestCase(unittest.TestCase):
@@ -82,5 +82,34 @@ class FilterDetectedObjectsTestCase(unittest.TestCase):
         self.assertEqual(filtered_out, 2)
 
 
+class DeduplicateTagsTestCase(unittest.TestCase):
+    """Unit tests for collapsing detections into one PhotoTag per tag."""
+
+    def test_keeps_highest_confidence_per_tag(self):
+        detections = [
+            {"tag": "dog", "confidence": 0.6},
+            {"tag": "cat", "confidence": 0.7},
+            {"tag": "dog", "confidence": 0.9},
+            {"tag": "dog", "confidence": 0.8},
+        ]
+
+        unique_tags = deduplicate_tags(detections)
+
+        self.assertEqual(set(unique_tags), {"dog", "cat"})
+        self.assertIs(unique_tags["dog"], detections[2])
+        self.assertEqual(unique_tags["cat"]["confidence"], 0.7)
+
+    def test_ties_keep_first_detection(self):
+        detections = [
+            {"tag": "car", "confidence": 0.5, "id": 1},
+            {"tag": "car", "confidence": 0.5, "id": 2},
+        ]
+
+        self.assertEqual(deduplicate_tags(detections)["car"]["id"], 1)
+
+    def test_empty_input(self):
+        self.assertEqual(deduplicate_tags([]), {})
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,83 @@
+import os
+import unittest
+
+import numpy as np
+
+from config import settings
+from workers.pdq import (
+    PDQ_MATCH_THRESHOLD, hamming_distance, hamming_distances, is_duplicate, pack_hashes
+)
+
+
+def _flip_bits(value: bytes, count: int) -> bytes:
+    """Return value with its lowest `count` bits inverted."""
+    flipped = int.from_bytes(value, "big") ^ ((1 << count) - 1)
+    return flipped.to_bytes(len(value), "big")
+
+
+class HammingDistanceTestCase(unittest.TestCase):
+    """Unit tests for PDQ hash Hamming distance."""
+
+    def test_identical_hashes_have_zero_distance(self):
+        value = bytes(range(32))
+        self.assertEqual(hamming_distance(value, value), 0)
+
+    def test_counts_differing_bits_not_bytes(self):
+        a = bytes(32)
+        b = bytes([0xFF]) + bytes(30) + bytes([0x01])
+        self.assertEqual(hamming_distance(a, b), 9)
+
+    def test_length_mismatch_raises(self):
+        with self.assertRaises(ValueError):
+            hamming_distance(bytes(32), bytes(31))
+
+
+class PackedHammingDistanceTestCase(unittest.TestCase):
+    """Unit tests for vectorized PDQ distances over packed uint64 hashes."""
+
+    def test_pack_hashes_shape_and_dtype(self):
+        packed = pack_hashes([bytes(32), bytes(range(32))])
+        self.assertEqual(packed.dtype, np.uint64)
+        self.assertEqual(packed.shape, (2, 4))
+
+    def test_matches_scalar_distance(self):
+        query = bytes(range(32))
+        others = [bytes(32), bytes([0xFF]) * 32, bytes(range(32)), bytes(range(1, 33))]
+
+        distances = hamming_distances(query, pack_hashes(others))
+
+        self.assertEqual(distances.tolist(), [hamming_distance(query, other) for other in others])
+
+    def test_invalid_length_raises(self):
+        with self.assertRaises(ValueError):
+            pack_hashes([bytes(31)])
+
+
+class DuplicateThresholdTestCase(unittest.TestCase):
+    """The duplicate threshold counts differing bits, not hex characters."""
+
+    @unittest.skipIf("DUPLICATE_THRESHOLD" in os.environ, "threshold overridden by environment")
+    def test_default_threshold_is_pdq_bit_threshold(self):
+        self.assertEqual(settings.DUPLICATE_THRESHOLD, PDQ_MATCH_THRESHOLD)
+
+    def test_threshold_boundary_in_bits(self):
+        base = bytes(range(32))
+        at_threshold = hamming_distance(base, _flip_bits(base, PDQ_MATCH_THRESHOLD))
+        past_threshold = hamming_distance(base, _flip_bits(base, PDQ_MATCH_THRESHOLD + 1))
+
+        self.assertEqual(at_threshold, PDQ_MATCH_THRESHOLD)
+        self.assertTrue(is_duplicate(at_threshold))
+        self.assertFalse(is_duplicate(past_threshold))
+
+    def test_pairs_within_old_hex_character_limit_still_match(self):
+        # 8 hex characters with 3 flipped bits each: inside the old 8-character
+        # default, 24 bits apart, and rejected by a literal 8-bit threshold
+        base = bytes(32)
+        changed = bytes([0x77] * 4) + bytes(28)
+        distance = hamming_distance(base, changed)
+
+        self.assertEqual(distance, 24)
+        self.assertTrue(is_duplicate(distance))
+
+if __name__ == "__main__":
+    unittest.main()
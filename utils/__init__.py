@@ -1,22 +1,19 @@
 """Utils package for AI Photos Management."""
 
-from .db import get_db_session, execute_with_session
-from .image_utils import (
-    ImageConversionError,
-    convert_to_jpeg,
-    generate_thumbnail,
-    get_image_dimensions,
-    get_file_size,
-    process_image_for_storage,
-    is_supported_format,
-    is_raw_format,
-    is_heic_format
-)
+from importlib import import_module
+from typing import Any
+
+from .db import get_db_session, execute_with_session, bulk_copy
+from .cache import cache_get_json, cache_set_json
 
 __all__ = [
     # Database utils
     "get_db_session",
     "execute_with_session",
+    "bulk_copy",
+    # Cache utils
+    "cache_get_json",
+    "cache_set_json",
     # Image utils
     "ImageConversionError",
     "convert_to_jpeg",
@@ -24,8 +21,31 @@ __all__ = [
     "get_image_dimensions",
     "get_file_size",
     "process_image_for_storage",
+    "process_images_for_storage_batch",
     "is_supported_format",
     "is_raw_format",
     "is_heic_format",
 ]
 
+
+# Image helpers pull in PIL; imported on first use (PEP 562)
+_IMAGE_UTILS_EXPORTS = {
+    "ImageConversionError",
+    "convert_to_jpeg",
+    "generate_thumbnail",
+    "get_image_dimensions",
+    "get_file_size",
+    "process_image_for_storage",
+    "process_images_for_storage_batch",
+    "is_supported_format",
+    "is_raw_format",
+    "is_heic_format",
+}
+
+
+def __getattr__(name: str) -> Any:  # pragma: no cover - thin lazy importer
+    if name in _IMAGE_UTILS_EXPORTS:
+        module = import_module(".image_utils", __name__)
+        return getattr(module, name)
+
+    raise AttributeError(f"module 'utils' has no attribute {name!r}")
@@ -0,0 +1,49 @@
+"""
+Redis-backed cache for small JSON-serializable values.
+
+The cache is an optimization only: when Redis is unreachable, reads miss
+and writes are skipped, so callers always fall back to computing the value.
+"""
+
+import json
+import logging
+from functools import lru_cache
+from typing import Any, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Keep a down Redis from stalling requests that would otherwise succeed
+CACHE_SOCKET_TIMEOUT = 0.5
+
+
+@lru_cache(maxsize=1)
+def get_redis():
+    """Return the shared Redis client (connections are pooled by the client)."""
+    import redis
+
+    return redis.Redis.from_url(
+        settings.REDIS_URL,
+        socket_timeout=CACHE_SOCKET_TIMEOUT,
+        socket_connect_timeout=CACHE_SOCKET_TIMEOUT,
+    )
+
+
+def cache_get_json(key: str) -> Optional[Any]:
+    """Return the cached value for key, or None on a miss or Redis error."""
+    try:
+        raw = get_redis().get(key)
+    except Exception as e:
+        logger.warning(f"Cache read failed for {key}: {e}")
+        return None
+
+    return json.loads(raw) if raw is not None else None
+
+
+def cache_set_json(key: str, value: Any, ttl: int) -> None:
+    """Store value under key for ttl seconds; errors are logged and ignored."""
+    try:
+        get_redis().set(key, json.dumps(value), ex=ttl)
+    except Exception as e:
+        logger.warning(f"Cache write failed for {key}: {e}")
@@ -2,12 +2,19 @@
 Database utility functions for session management and common queries.
 """
 
+import csv
+import io
 from contextlib import contextmanager
-from typing import Generator
+from typing import Dict, Generator, List, Sequence
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from models import get_session
 
 
+# Below this many rows a multi-row INSERT is as fast as COPY
+BULK_COPY_MIN_ROWS = 100
+
+
 @contextmanager
 def get_db_session() -> Generator[Session, None, None]:
     """
@@ -45,3 +52,84 @@ def execute_with_session(func):
             return func(session, *args, **kwargs)
     return wrapper
 
+
+
+def _copy_text(value):
+    """Render a bind-processed value as COPY csv text; None stays NULL."""
+    # Unwrap DBAPI adapters such as psycopg2.Binary returned by bind processors
+    value = getattr(value, "adapted", value)
+    if value is None:
+        return None
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "\\x" + bytes(value).hex()
+    return str(value)
+
+
+def bulk_copy(session: Session, table, rows: List[Dict], columns: Sequence[str]) -> int:
+    """
+    Insert many rows using PostgreSQL COPY, inside the session's transaction.
+    
+    Falls back to an executemany INSERT for small batches and for
+    non-PostgreSQL databases. Like the INSERT, COPY applies column bind
+    processors and Python-side defaults for columns missing from a row.
+    The caller is responsible for committing.
+    
+    Args:
+        session: Active database session
+        table: Mapped model class or Table
+        rows: Row dicts keyed by column name
+        columns: Columns to write, in COPY order
+        
+    Returns:
+        Number of rows inserted
+    
+    Raises:
+        ValueError: If a row omits a column whose default is a SQL expression or sequence
+    """
+    table = getattr(table, "__table__", table)
+    dialect = session.get_bind().dialect
+    
+    if len(rows) <= BULK_COPY_MIN_ROWS or dialect.name != "postgresql":
+        if rows:
+            session.execute(insert(table), rows)
+        return len(rows)
+    
+    # Unlisted columns with defaults are filled in as INSERT would
+    columns = list(columns) + [
+        column.name for column in table.columns
+        if column.name not in columns and column.default is not None
+    ]
+    processors = [table.c[name].type.bind_processor(dialect) for name in columns]
+    defaults = [table.c[name].default for name in columns]
+    
+    buffer = io.StringIO()
+    # Non-NULL values are always quoted, so only a real None is read back as NULL
+    writer = csv.writer(buffer, quoting=csv.QUOTE_NOTNULL)
+    for row in rows:
+        record = []
+        for name, processor, default in zip(columns, processors, defaults):
+            if name in row:
+                value = row[name]
+            elif default is None:
+                value = None
+            elif default.is_scalar:
+                value = default.arg
+            elif default.is_callable:
+                value = default.arg(None)
+            else:
+                raise ValueError(f"bulk_copy cannot evaluate the SQL default of {table.name}.{name}")
+            if processor is not None:
+                value = processor(value)
+            record.append(_copy_text(value))
+        writer.writerow(record)
+    buffer.seek(0)
+    
+    # COPY through the raw psycopg2 connection bound to this session's transaction
+    raw_conn = session.connection().connection
+    with raw_conn.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    
+    return len(rows)
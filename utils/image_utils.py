@@ -4,16 +4,34 @@ Handles HEIC, RAW formats, and creates standardized JPEG thumbnails.
 """
 
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import List, Tuple, Optional, Union
 from PIL import Image
-import pillow_heif
-import rawpy
-import numpy as np
+from tqdm import tqdm
 from config import settings
 
-# Register HEIF opener with PIL
-pillow_heif.register_heif_opener()
+# File extensions by format family, built once for the per-file checks
+RAW_EXTENSIONS = frozenset({'.cr2', '.nef', '.dng', '.arw', '.raw', '.orf', '.rw2', '.pef'})
+HEIC_EXTENSIONS = frozenset({'.heic', '.heif'})
+JPEG_EXTENSIONS = frozenset({'.jpg', '.jpeg'})
+
+
+@lru_cache(maxsize=None)
+def _register_heif_opener() -> None:
+    """Teach PIL to open HEIC/HEIF; pillow_heif is imported on first HEIC file only."""
+    import pillow_heif
+    
+    pillow_heif.register_heif_opener()
+
+
+def _open_image(image_path: Path) -> Image.Image:
+    """Open an image with PIL, registering the HEIF opener first if needed."""
+    if is_heic_format(Path(image_path)):
+        _register_heif_opener()
+    return Image.open(image_path)
 
 
 class ImageConversionError(Exception):
@@ -23,14 +41,80 @@ class ImageConversionError(Exception):
 
 def is_raw_format(file_path: Path) -> bool:
     """Check if file is a RAW image format."""
-    raw_extensions = {'.cr2', '.nef', '.dng', '.arw', '.raw', '.orf', '.rw2', '.pef'}
-    return file_path.suffix.lower() in raw_extensions
+    return file_path.suffix.lower() in RAW_EXTENSIONS
 
 
 def is_heic_format(file_path: Path) -> bool:
     """Check if file is a HEIC/HEIF format."""
-    heic_extensions = {'.heic', '.heif'}
-    return file_path.suffix.lower() in heic_extensions
+    return file_path.suffix.lower() in HEIC_EXTENSIONS
+
+
+def _decode_raw(raw_path: Path) -> Image.Image:
+    """Demosaic a RAW file into an in-memory RGB image."""
+    import rawpy
+    
+    with rawpy.imread(str(raw_path)) as raw:
+        # Process RAW image with default parameters
+        rgb = raw.postprocess(
+            use_camera_wb=True,
+            half_size=False,
+            no_auto_bright=False,
+            output_bps=8
+        )
+    
+    # Convert numpy array to PIL Image
+    return Image.fromarray(rgb)
+
+
+def _decode_source(image_path: Path) -> Image.Image:
+    """Decode a RAW, HEIC or other PIL-readable file into an in-memory RGB image."""
+    if is_raw_format(image_path):
+        return _decode_raw(image_path)
+    
+    with _open_image(image_path) as img:
+        return img.convert('RGB')
+
+
+def _save_thumbnail(img: Image.Image, thumbnail_path: Path, max_size: int) -> None:
+    """Downscale an opened or in-memory image in place and save it as the JPEG thumbnail."""
+    # JPEG sources are decoded by libjpeg at 1/2-1/8 scale while still at least
+    # twice the target size, so most pixels are never decoded (no-op otherwise)
+    img.draft('RGB', (max_size * 2, max_size * 2))
+    
+    # Convert to RGB if necessary
+    if img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+    
+    # Calculate thumbnail size maintaining aspect ratio; reducing_gap box-filters
+    # down to twice the target before the final LANCZOS pass
+    img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS, reducing_gap=2.0)
+    
+    # Save thumbnail
+    img.save(thumbnail_path, 'JPEG', quality=85, optimize=True)
+
+
+@lru_cache(maxsize=None)
+def _load_pyvips():
+    """Return the pyvips module, or None when libvips is not installed."""
+    try:
+        import pyvips
+    except (ImportError, OSError):  # OSError: binding present but libvips missing
+        return None
+    return pyvips
+
+
+def _save_thumbnail_vips(pyvips, image_path: Path, thumbnail_path: Path, max_size: int) -> None:
+    """Decode, shrink and encode a JPEG thumbnail in one streamed libvips pipeline."""
+    # Orientation is left as stored, matching the PIL thumbnails
+    thumb = pyvips.Image.thumbnail(str(image_path), max_size, size='down', no_rotate=True)
+    thumb.write_to_file(str(thumbnail_path), Q=85, strip=True, optimize_coding=True)
+
+
+def _thumbnail_path_for(image_path: Path, thumbnail_dir: Optional[Path] = None) -> Path:
+    """Return the thumbnail path for an image, creating the thumbnail directory."""
+    thumbnail_dir = settings.THUMBNAIL_DIR if thumbnail_dir is None else Path(thumbnail_dir)
+    thumbnail_dir.mkdir(parents=True, exist_ok=True)
+    return thumbnail_dir / f"thumb_{Path(image_path).stem}.jpg"
 
 
 def convert_raw_to_jpeg(raw_path: Path, output_path: Path) -> Tuple[int, int]:
@@ -48,22 +132,12 @@ def convert_raw_to_jpeg(raw_path: Path, output_path: Path) -> Tuple[int, int]:
         ImageConversionError: If conversion fails
     """
     try:
-        with rawpy.imread(str(raw_path)) as raw:
-            # Process RAW image with default parameters
-            rgb = raw.postprocess(
-                use_camera_wb=True,
-                half_size=False,
-                no_auto_bright=False,
-                output_bps=8
-            )
-            
-            # Convert numpy array to PIL Image
-            image = Image.fromarray(rgb)
-            
-            # Save as JPEG with good quality
-            image.save(output_path, 'JPEG', quality=95, optimize=True)
-            
-            return image.size
+        image = _decode_raw(raw_path)
+        
+        # Save as JPEG with good quality
+        image.save(output_path, 'JPEG', quality=95, optimize=True)
+        
+        return image.size
             
     except Exception as e:
         raise ImageConversionError(f"Failed to convert RAW image {raw_path}: {e}")
@@ -85,7 +159,7 @@ def convert_heic_to_jpeg(heic_path: Path, output_path: Path) -> Tuple[int, int]:
     """
     try:
         # PIL with pillow_heif can open HEIC directly
-        image = Image.open(heic_path)
+        image = _open_image(heic_path)
         
         # Convert to RGB if necessary
         if image.mode != 'RGB':
@@ -118,7 +192,7 @@ def convert_to_jpeg(input_path: Path, output_dir: Optional[Path] = None) -> Tupl
     input_path = Path(input_path)
     
     # Check if already JPEG
-    if input_path.suffix.lower() in {'.jpg', '.jpeg'}:
+    if input_path.suffix.lower() in JPEG_EXTENSIONS:
         try:
             with Image.open(input_path) as img:
                 return input_path, img.size
@@ -174,30 +248,19 @@ def generate_thumbnail(
     Raises:
         ImageConversionError: If thumbnail generation fails
     """
-    if thumbnail_dir is None:
-        thumbnail_dir = settings.THUMBNAIL_DIR
-    else:
-        thumbnail_dir = Path(thumbnail_dir)
-    
-    thumbnail_dir.mkdir(parents=True, exist_ok=True)
+    thumbnail_path = _thumbnail_path_for(image_path, thumbnail_dir)
     
-    # Create thumbnail filename
-    thumbnail_filename = f"thumb_{image_path.stem}.jpg"
-    thumbnail_path = thumbnail_dir / thumbnail_filename
+    # libvips shrinks JPEGs on load and streams the resize, far cheaper than PIL
+    pyvips = _load_pyvips() if Path(image_path).suffix.lower() in JPEG_EXTENSIONS else None
     
     try:
-        with Image.open(image_path) as img:
-            # Convert to RGB if necessary
-            if img.mode not in ('RGB', 'L'):
-                img = img.convert('RGB')
-            
-            # Calculate thumbnail size maintaining aspect ratio
-            img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+        if pyvips is not None:
+            _save_thumbnail_vips(pyvips, image_path, thumbnail_path, max_size)
+        else:
+            with _open_image(image_path) as img:
+                _save_thumbnail(img, thumbnail_path, max_size)
             
-            # Save thumbnail
-            img.save(thumbnail_path, 'JPEG', quality=85, optimize=True)
-            
-            return thumbnail_path
+        return thumbnail_path
             
     except Exception as e:
         raise ImageConversionError(f"Failed to generate thumbnail for {image_path}: {e}")
@@ -217,7 +280,7 @@ def get_image_dimensions(image_path: Path) -> Tuple[int, int]:
         ImageConversionError: If unable to read dimensions
     """
     try:
-        with Image.open(image_path) as img:
+        with _open_image(image_path) as img:
             return img.size
     except Exception as e:
         raise ImageConversionError(f"Failed to get dimensions for {image_path}: {e}")
@@ -269,26 +332,85 @@ def process_image_for_storage(
         'original_path': image_path
     }
     
-    # Convert to JPEG if needed
-    if convert_to_jpg:
-        processed_path, size = convert_to_jpeg(image_path)
-        result['processed_path'] = processed_path
-        result['width'], result['height'] = size
-        result['file_size'] = get_file_size(processed_path)
-    else:
-        result['processed_path'] = image_path
-        result['width'], result['height'] = get_image_dimensions(image_path)
-        result['file_size'] = get_file_size(image_path)
+    needs_conversion = convert_to_jpg and original_format not in JPEG_EXTENSIONS
+    processed_path = image_path.with_suffix('.jpg') if needs_conversion else image_path
+    thumbnail_path = _thumbnail_path_for(processed_path)
+    # JPEG sources are never decoded here, so libvips can shrink them on load
+    pyvips = _load_pyvips() if original_format in JPEG_EXTENSIONS else None
     
-    # Generate thumbnail
-    result['thumbnail_path'] = generate_thumbnail(
-        result['processed_path'],
-        max_size=settings.THUMBNAIL_SIZE
-    )
+    # Decode once: the full-size JPEG (when converting) and the thumbnail
+    # are both produced from the same in-memory image
+    try:
+        if needs_conversion:
+            image = _decode_source(image_path)
+            image.save(processed_path, 'JPEG', quality=95, optimize=True)
+        else:
+            image = _open_image(image_path)
+        
+        with image:
+            # Lazily opened sources only have their header read for the size
+            result['width'], result['height'] = image.size
+            if pyvips is not None:
+                _save_thumbnail_vips(pyvips, image_path, thumbnail_path, settings.THUMBNAIL_SIZE)
+            else:
+                _save_thumbnail(image, thumbnail_path, settings.THUMBNAIL_SIZE)
+            
+    except Exception as e:
+        raise ImageConversionError(f"Failed to process image {image_path}: {e}")
+    
+    result['processed_path'] = processed_path
+    result['thumbnail_path'] = thumbnail_path
+    result['file_size'] = get_file_size(processed_path)
     
     return result
 
 
+def _process_image_or_error(
+    image_path: Path,
+    convert_to_jpg: bool = True
+) -> Union[dict, ImageConversionError]:
+    """Pool worker: process one image, returning the conversion error instead of raising."""
+    try:
+        return process_image_for_storage(image_path, convert_to_jpg)
+    except ImageConversionError as e:
+        return e
+
+
+def process_images_for_storage_batch(
+    image_paths: List[Path],
+    convert_to_jpg: bool = True,
+    workers: Optional[int] = None
+) -> List[Union[dict, ImageConversionError]]:
+    """
+    Run process_image_for_storage over many images in a process pool.
+    
+    Decoding, resizing and encoding are CPU-bound and hold the GIL, so each
+    image is handled in a separate process. A progress bar is drawn when
+    stderr is a terminal.
+    
+    Args:
+        image_paths: Paths to original images
+        convert_to_jpg: Whether to convert non-JPEG formats
+        workers: Number of processes (default: CPU count)
+        
+    Returns:
+        One entry per input path, in order: the result dict from
+        process_image_for_storage, or the ImageConversionError it raised
+    """
+    if not image_paths:
+        return []
+    
+    worker = partial(_process_image_or_error, convert_to_jpg=convert_to_jpg)
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        return list(tqdm(
+            executor.map(worker, image_paths, chunksize=4),
+            total=len(image_paths),
+            desc="Processing images",
+            disable=not sys.stderr.isatty(),
+            mininterval=0.5
+        ))
+
+
 def is_supported_format(file_path: Path) -> bool:
     """
     Check if file format is supported for processing.
@@ -9,18 +9,51 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import gzip
 import logging
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional, Tuple
+
 from flask import Flask, render_template, request, jsonify, send_file
+from flask.json.provider import DefaultJSONProvider
 
 from config import settings
-from models import Photo, get_session, PhotoState, Category, PhotoTag
+from models import (
+    Photo, get_engine, count_photos_by_state, PhotoState, PROCESSING_STATES, Category, PhotoTag
+)
 from services import hybrid_search, get_photo_details
-from sqlalchemy import func, distinct
+from utils import cache_get_json, cache_set_json
+from sqlalchemy import func, distinct, tuple_
+from sqlalchemy.orm import load_only, scoped_session, sessionmaker
+
+try:
+    import orjson
+except ImportError:  # optional accelerator; Flask's stdlib json provider is used instead
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider encoding with orjson; unsupported types go through Flask's default()."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 
 # Create Flask app
 app = Flask(__name__)
 app.config['SECRET_KEY'] = settings.SECRET_KEY
 app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  # 100MB max
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 
 # Setup logging
 logging.basicConfig(
@@ -29,59 +62,135 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Gallery grids only render these columns; skip loading the rest per row
+GALLERY_PHOTO_FIELDS = load_only(Photo.id, Photo.filename, Photo.created_at)
+
+# The gallery total is shown on every page; a slightly stale value is fine
+GALLERY_TOTAL_CACHE_KEY = 'gallery:total_photos'
+GALLERY_TOTAL_CACHE_TTL = 60
+# Dashboards poll /api/stats; counts may lag by this many seconds
+STATS_CACHE_KEY = 'stats:processing'
+STATS_CACHE_TTL = 10
+
+# Thumbnails never change once generated, so browsers may cache them for a day
+THUMBNAIL_MAX_AGE = 86400
+# photo_id -> resolved thumbnail path entries kept in memory per process
+THUMBNAIL_PATH_CACHE_SIZE = 10_000
+# Let a fronting web server (nginx/Apache) stream files via X-Sendfile
+app.config['USE_X_SENDFILE'] = settings.USE_X_SENDFILE
+
+# JSON responses below this size are not worth compressing
+GZIP_MIN_SIZE = 1024
+# zlib level balancing CPU time against size for per-request compression
+GZIP_LEVEL = 6
+
+# One session per request on top of the engine's connection pool; routes are
+# read-only, so loaded objects stay usable while templates render
+db_session = scoped_session(sessionmaker(bind=get_engine(), expire_on_commit=False))
+
+
+@app.teardown_appcontext
+def remove_db_session(exception=None):
+    """Return the request's connection to the pool."""
+    db_session.remove()
+
+
+@app.after_request
+def gzip_json_response(response):
+    """Gzip JSON API responses for clients that accept it (search JSON compresses 5-10x)."""
+    if (
+        response.mimetype != 'application/json'
+        or response.direct_passthrough
+        or 'Content-Encoding' in response.headers
+        or 'gzip' not in request.accept_encodings
+    ):
+        return response
+    
+    data = response.get_data()
+    if len(data) < GZIP_MIN_SIZE:
+        return response
+    
+    response.set_data(gzip.compress(data, compresslevel=GZIP_LEVEL))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def _parse_gallery_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """Parse a '<created_at>_<id>' gallery cursor; None if absent or malformed."""
+    if not cursor:
+        return None
+    created_at, _, photo_id = cursor.rpartition('_')
+    try:
+        return datetime.fromisoformat(created_at), int(photo_id)
+    except ValueError:
+        return None
+
+
+def _completed_photo_count(session) -> int:
+    """Count completed photos, cached briefly so gallery pages skip the COUNT(*)."""
+    total = cache_get_json(GALLERY_TOTAL_CACHE_KEY)
+    if total is None:
+        total = session.query(func.count(Photo.id)).filter(
+            Photo.state == PhotoState.COMPLETED
+        ).scalar()
+        cache_set_json(GALLERY_TOTAL_CACHE_KEY, total, GALLERY_TOTAL_CACHE_TTL)
+    return total
+
 
 @app.route('/')
 def index():
     """Home page showing photo gallery."""
-    session = None
     try:
         page = request.args.get('page', 1, type=int)
         page_size = settings.GALLERY_PAGE_SIZE
+        cursor = _parse_gallery_cursor(request.args.get('cursor'))
         
-        session = get_session()
+        session = db_session()
         
         # Get total count
-        total_photos = session.query(Photo).filter(
-            Photo.state == PhotoState.COMPLETED
-        ).count()
+        total_photos = _completed_photo_count(session)
         
-        # Get paginated photos
-        photos = session.query(Photo).filter(
+        # Get paginated photos; "Next" links carry a cursor so sequential
+        # browsing seeks past the previous page instead of scanning an OFFSET
+        query = session.query(Photo).options(GALLERY_PHOTO_FIELDS).filter(
             Photo.state == PhotoState.COMPLETED
-        ).order_by(Photo.created_at.desc()).offset(
-            (page - 1) * page_size
-        ).limit(page_size).all()
+        )
+        if cursor:
+            query = query.filter(tuple_(Photo.created_at, Photo.id) < cursor)
+        else:
+            query = query.offset((page - 1) * page_size)
+        
+        # One extra row tells whether a next page exists
+        photos = query.order_by(
+            Photo.created_at.desc(), Photo.id.desc()
+        ).limit(page_size + 1).all()
+        
+        next_cursor = None
+        if len(photos) > page_size:
+            photos = photos[:page_size]
+            next_cursor = f"{photos[-1].created_at.isoformat()}_{photos[-1].id}"
         
         # Calculate pagination
         total_pages = (total_photos + page_size - 1) // page_size
         
-        # Close session before rendering
-        session.close()
-        session = None
-        
         return render_template(
             'index.html',
             photos=photos,
             page=page,
             total_pages=total_pages,
-            total_photos=total_photos
+            total_photos=total_photos,
+            next_cursor=next_cursor
         )
         
     except Exception as e:
         logger.error(f"Error in index route: {e}")
         return render_template('error.html', error=str(e)), 500
-    finally:
-        if session:
-            try:
-                session.close()
-            except:
-                pass
 
 
 @app.route('/search')
 def search():
     """Search page with hybrid search."""
-    session = None
     try:
         query = request.args.get('q', '')
         mode = request.args.get('mode', 'hybrid')
@@ -89,10 +198,7 @@ def search():
         page = request.args.get('page', 1, type=int)
         
         # Get available categories for filter
-        session = get_session()
-        all_categories = session.query(Category).all()
-        session.close()
-        session = None
+        all_categories = db_session.query(Category).all()
         
         results = None
         if query:
@@ -119,12 +225,6 @@ def search():
     except Exception as e:
         logger.error(f"Error in search route: {e}")
         return render_template('error.html', error=str(e)), 500
-    finally:
-        if session:
-            try:
-                session.close()
-            except:
-                pass
 
 
 @app.route('/photo/<int:photo_id>')
@@ -143,100 +243,95 @@ def photo_detail(photo_id):
         return render_template('error.html', error=str(e)), 500
 
 
+@lru_cache(maxsize=THUMBNAIL_PATH_CACHE_SIZE)
+def _thumbnail_path(photo_id: int) -> Path:
+    """
+    Look up and resolve a photo's thumbnail path.
+    
+    Raises LookupError when the photo has no thumbnail yet; lru_cache does
+    not cache exceptions, so only found paths are memoized.
+    """
+    thumbnail_path_str = db_session.query(Photo.thumbnail_path).filter_by(id=photo_id).scalar()
+    if not thumbnail_path_str:
+        raise LookupError(photo_id)
+    
+    thumbnail_path = Path(thumbnail_path_str)
+    
+    # If path is relative, resolve it relative to project root
+    if not thumbnail_path.is_absolute():
+        project_root = Path(__file__).parent.parent
+        thumbnail_path = (project_root / thumbnail_path).resolve()
+    
+    return thumbnail_path
+
+
 @app.route('/thumbnail/<int:photo_id>')
 def serve_thumbnail(photo_id):
     """Serve thumbnail image."""
-    session = None
     try:
-        session = get_session()
-        photo = session.query(Photo).filter_by(id=photo_id).first()
-        
-        if not photo or not photo.thumbnail_path:
+        # Thumbnail paths never change, so repeat requests skip the database
+        try:
+            thumbnail_path = _thumbnail_path(photo_id)
+        except LookupError:
             return "Thumbnail not found", 404
         
-        # Get thumbnail path before closing session
-        thumbnail_path_str = photo.thumbnail_path
-        
-        # Close session immediately to free connection
-        session.close()
-        session = None
-        
-        thumbnail_path = Path(thumbnail_path_str)
-        
-        # If path is relative, resolve it relative to project root
-        if not thumbnail_path.is_absolute():
-            project_root = Path(__file__).parent.parent
-            thumbnail_path = (project_root / thumbnail_path).resolve()
-        
         if not thumbnail_path.exists():
             logger.error(f"Thumbnail file not found: {thumbnail_path}")
             return "Thumbnail file not found", 404
         
-        return send_file(thumbnail_path, mimetype='image/jpeg')
+        # Conditional responses let browsers revalidate cached thumbnails with
+        # a 304; the ETag derives from the file's mtime and size
+        return send_file(
+            thumbnail_path,
+            mimetype='image/jpeg',
+            conditional=True,
+            etag=True,
+            max_age=THUMBNAIL_MAX_AGE
+        )
         
     except Exception as e:
         logger.error(f"Error serving thumbnail: {e}")
         return "Error serving thumbnail", 500
-    finally:
-        # Ensure session is closed even on error
-        if session:
-            try:
-                session.close()
-            except:
-                pass
+
+
+def _processing_stats(session) -> dict:
+    """Summarize photo processing states from one GROUP BY round trip."""
+    counts = count_photos_by_state(session)
+    total = sum(counts.values())
+    completed = counts.get(PhotoState.COMPLETED, 0)
+    
+    processing = sum(counts.get(state, 0) for state in PROCESSING_STATES)
+    
+    completion_percentage = (completed / total * 100) if total > 0 else 0
+    
+    return {
+        'total_photos': total,
+        'completed': completed,
+        'pending': counts.get(PhotoState.PENDING, 0),
+        'processing': processing,
+        'partial': counts.get(PhotoState.PARTIAL, 0),
+        'failed': counts.get(PhotoState.FAILED, 0),
+        'completion_percentage': round(completion_percentage, 2)
+    }
 
 
 @app.route('/api/stats')
 def api_stats():
     """API endpoint for processing statistics."""
-    session = None
     try:
-        session = get_session()
-        
-        # Count photos by state
-        total = session.query(Photo).count()
-        completed = session.query(Photo).filter(Photo.state == PhotoState.COMPLETED).count()
-        pending = session.query(Photo).filter(Photo.state == PhotoState.PENDING).count()
-        failed = session.query(Photo).filter(Photo.state == PhotoState.FAILED).count()
-        partial = session.query(Photo).filter(Photo.state == PhotoState.PARTIAL).count()
-        
-        # Processing states
-        processing_states = [
-            PhotoState.PREPROCESSING,
-            PhotoState.PROCESSING_OBJECTS,
-            PhotoState.PROCESSING_EMBEDDINGS,
-            PhotoState.PROCESSING_OCR,
-            PhotoState.PROCESSING_FACES,
-            PhotoState.PROCESSING_HASH,
-            PhotoState.CHECKING_DUPLICATES
-        ]
-        processing = session.query(Photo).filter(Photo.state.in_(processing_states)).count()
-        
-        # Close session before preparing response
-        session.close()
-        session = None
-        
-        completion_percentage = (completed / total * 100) if total > 0 else 0
-        
-        return jsonify({
-            'total_photos': total,
-            'completed': completed,
-            'pending': pending,
-            'processing': processing,
-            'partial': partial,
-            'failed': failed,
-            'completion_percentage': round(completion_percentage, 2)
-        })
+        stats = cache_get_json(STATS_CACHE_KEY)
+        if stats is None:
+            stats = _processing_stats(db_session())
+            cache_set_json(STATS_CACHE_KEY, stats, STATS_CACHE_TTL)
+        
+        response = jsonify(stats)
+        response.cache_control.public = True
+        response.cache_control.max_age = STATS_CACHE_TTL
+        return response
         
     except Exception as e:
         logger.error(f"Error in stats API: {e}")
         return jsonify({'error': str(e)}), 500
-    finally:
-        if session:
-            try:
-                session.close()
-            except:
-                pass
 
 
 @app.route('/api/search')
@@ -287,9 +382,8 @@ def api_search():
 @app.route('/categories')
 def categories_list():
     """Categories list page showing all categories with photo counts."""
-    session = None
     try:
-        session = get_session()
+        session = db_session()
         
         # Get categories with photo counts (only non-empty categories)
         categories = session.query(
@@ -305,32 +399,21 @@ def categories_list():
             func.count(distinct(PhotoTag.photo_id)) > 0
         ).order_by(Category.name).all()
         
-        # Close session before rendering
-        session.close()
-        session = None
-        
         return render_template('categories.html', categories=categories)
         
     except Exception as e:
         logger.error(f"Error in categories route: {e}")
         return render_template('error.html', error=str(e)), 500
-    finally:
-        if session:
-            try:
-                session.close()
-            except:
-                pass
 
 
 @app.route('/categories/<category_name>')
 def category_detail(category_name):
     """Category detail page showing photos for a specific category."""
-    session = None
     try:
         page = request.args.get('page', 1, type=int)
         page_size = settings.GALLERY_PAGE_SIZE
         
-        session = get_session()
+        session = db_session()
         
         # Get category
         category = session.query(Category).filter(
@@ -349,7 +432,7 @@ def category_detail(category_name):
         ).scalar()
         
         # Get paginated photos
-        photos = session.query(Photo).join(
+        photos = session.query(Photo).options(GALLERY_PHOTO_FIELDS).join(
             PhotoTag, Photo.id == PhotoTag.photo_id
         ).filter(
             PhotoTag.category_id == category.id,
@@ -361,10 +444,6 @@ def category_detail(category_name):
         # Calculate pagination
         total_pages = (total_photos + page_size - 1) // page_size
         
-        # Close session before rendering
-        session.close()
-        session = None
-        
         return render_template(
             'category_detail.html',
             category=category,
@@ -377,20 +456,13 @@ def category_detail(category_name):
     except Exception as e:
         logger.error(f"Error in category_detail route: {e}")
         return render_template('error.html', error=str(e)), 500
-    finally:
-        if session:
-            try:
-                session.close()
-            except:
-                pass
 
 
 @app.route('/tags')
 def tags_list():
     """Tags list page showing all tags grouped by category."""
-    session = None
     try:
-        session = get_session()
+        session = db_session()
         
         # Get all tags with their category and photo counts
         tags_data = session.query(
@@ -421,32 +493,21 @@ def tags_list():
                 'photo_count': photo_count
             })
         
-        # Close session before rendering
-        session.close()
-        session = None
-        
         return render_template('tags.html', tags_by_category=tags_by_category)
         
     except Exception as e:
         logger.error(f"Error in tags route: {e}")
         return render_template('error.html', error=str(e)), 500
-    finally:
-        if session:
-            try:
-                session.close()
-            except:
-                pass
 
 
 @app.route('/tags/<tag_name>')
 def tag_detail(tag_name):
     """Tag detail page showing photos for a specific tag."""
-    session = None
     try:
         page = request.args.get('page', 1, type=int)
         page_size = settings.GALLERY_PAGE_SIZE
         
-        session = get_session()
+        session = db_session()
         
         # Get total count
         total_photos = session.query(func.count(distinct(Photo.id))).join(
@@ -460,7 +521,7 @@ def tag_detail(tag_name):
             return render_template('error.html', error='Tag not found'), 404
         
         # Get paginated photos
-        photos = session.query(Photo).join(
+        photos = session.query(Photo).options(GALLERY_PHOTO_FIELDS).join(
             PhotoTag, Photo.id == PhotoTag.photo_id
         ).filter(
             PhotoTag.tag == tag_name,
@@ -472,10 +533,6 @@ def tag_detail(tag_name):
         # Calculate pagination
         total_pages = (total_photos + page_size - 1) // page_size
         
-        # Close session before rendering
-        session.close()
-        session = None
-        
         return render_template(
             'tag_detail.html',
             tag_name=tag_name,
@@ -488,12 +545,6 @@ def tag_detail(tag_name):
     except Exception as e:
         logger.error(f"Error in tag_detail route: {e}")
         return render_template('error.html', error=str(e)), 500
-    finally:
-        if session:
-            try:
-                session.close()
-            except:
-                pass
 
 
 @app.errorhandler(404)
@@ -11,6 +11,10 @@ __all__ = [
     "ai_models",
     "initialize_models",
     "warmup_models",
+    "get_detr",
+    "get_clip",
+    "get_ocr",
+    "get_face_app",
     "recognize_objects",
     "generate_image_embedding",
     "generate_text_embedding",
@@ -32,6 +36,10 @@ def __getattr__(name: str) -> Any:  # pragma: no cover - thin lazy importer
     if name in {
         "initialize_models",
         "warmup_models",
+        "get_detr",
+        "get_clip",
+        "get_ocr",
+        "get_face_app",
         "recognize_objects",
         "generate_image_embedding",
         "generate_text_embedding",
@@ -2,35 +2,43 @@
 AI Models loader and inference functions.
 Functional approach to managing AI models: DETR, OpenCLIP, PaddleOCR, InsightFace, PDQ Hash.
 
+Models are loaded lazily on first use by the get_* accessors, so importing
+this module does not pull in torch, transformers, PaddleOCR or InsightFace.
+
 NOTE: PaddleOCR and InsightFace use ONNX Runtime which doesn't support CUDA 13 yet.
 Both are configured to use CPU mode for compatibility. Performance is still good:
 - PaddleOCR: ~100-200ms per image (CPU)
 - InsightFace: ~50-100ms per image (CPU)
 """
 
-import torch
 import numpy as np
 from PIL import Image
+from functools import lru_cache, wraps
 from pathlib import Path
-from typing import List, Tuple, Dict, Optional
+from typing import TYPE_CHECKING, Any, List, Tuple, Dict, Optional
 import logging
-
-# Model imports
-from transformers import AutoModel, AutoProcessor
-import open_clip
-from paddleocr import PaddleOCR
-import insightface
-import pdqhash
-import cv2
+import os
+import threading
+import time
 
 from config import settings
 
+if TYPE_CHECKING:
+    import torch
+
 # Setup logging
 logging.basicConfig(level=getattr(logging, settings.LOG_LEVEL))
 logger = logging.getLogger(__name__)
 
 
-# Global model storage (functional singleton pattern)
+# Dummy forward passes run at load time; the second pass catches re-specialization
+WARMUP_PASSES = 2
+
+# Distinct search strings kept by generate_text_embedding (2 KB each as FP16)
+TEXT_EMBEDDING_CACHE_SIZE = 4096
+
+
+# Global model storage (functional singleton pattern), filled by the get_* accessors
 _models_cache = {
     'initialized': False,
     'device': None,
@@ -58,14 +66,19 @@ def _load_detr_model() -> None:
             cache_dir=settings.MODEL_CACHE_DIR
         )
         
-        _models_cache['detr_model'] = DetrForObjectDetection.from_pretrained(
+        model = DetrForObjectDetection.from_pretrained(
             settings.DETR_MODEL_NAME,
             cache_dir=settings.MODEL_CACHE_DIR
-        ).eval()
+        ).eval().requires_grad_(False)
         
         # Move to device and enable mixed precision
         if device == 'cuda':
-            _models_cache['detr_model'] = _models_cache['detr_model'].cuda()
+            model = model.cuda()
+        elif settings.DETR_ONNX_CPU:
+            model = _load_detr_onnx(model)
+        
+        # Published last: get_detr() skips the load lock once this is set
+        _models_cache['detr_model'] = model
         
         logger.info(f"✓ DETR model loaded: {settings.DETR_MODEL_NAME}")
         
@@ -74,11 +87,98 @@ def _load_detr_model() -> None:
         raise
 
 
+class _OnnxDetr:
+    """
+    ONNX Runtime stand-in for DetrForObjectDetection on CPU.
+
+    Called like the torch model and returns torch tensors, so the HF processor's
+    post-processing works unchanged.
+    """
+
+    def __init__(self, session, config):
+        self.session = session
+        self.config = config
+
+    def __call__(self, pixel_values, pixel_mask=None):
+        import torch
+        from transformers.models.detr.modeling_detr import DetrObjectDetectionOutput
+
+        if pixel_mask is None:
+            pixel_mask = torch.ones(pixel_values.shape[0], *pixel_values.shape[2:], dtype=torch.int64)
+
+        logits, pred_boxes = self.session.run(None, {
+            'pixel_values': pixel_values.numpy(),
+            'pixel_mask': pixel_mask.numpy().astype(np.int64),
+        })
+        return DetrObjectDetectionOutput(
+            logits=torch.from_numpy(logits),
+            pred_boxes=torch.from_numpy(pred_boxes)
+        )
+
+
+def _load_detr_onnx(model):
+    """
+    Run DETR through ONNX Runtime on CPU, exporting it to MODEL_CACHE_DIR on first use.
+
+    Returns the eager model unchanged if onnxruntime is unavailable or export fails.
+    """
+    try:
+        import onnxruntime as ort
+        import torch
+
+        onnx_path = Path(settings.MODEL_CACHE_DIR) / f"{settings.DETR_MODEL_NAME.replace('/', '--')}.onnx"
+
+        if not onnx_path.exists():
+            logger.info("Exporting DETR to ONNX (first run only)...")
+
+            class _DetrOutputs(torch.nn.Module):
+                def __init__(self, detr):
+                    super().__init__()
+                    self.detr = detr
+
+                def forward(self, pixel_values, pixel_mask):
+                    outputs = self.detr(pixel_values=pixel_values, pixel_mask=pixel_mask)
+                    return outputs.logits, outputs.pred_boxes
+
+            dummy_pixels = torch.zeros(1, 3, 800, 800)
+            dummy_mask = torch.ones(1, 800, 800, dtype=torch.int64)
+            tmp_path = onnx_path.with_suffix('.onnx.tmp')
+            torch.onnx.export(
+                _DetrOutputs(model),
+                (dummy_pixels, dummy_mask),
+                str(tmp_path),
+                input_names=['pixel_values', 'pixel_mask'],
+                output_names=['logits', 'pred_boxes'],
+                dynamic_axes={
+                    'pixel_values': {0: 'batch', 2: 'height', 3: 'width'},
+                    'pixel_mask': {0: 'batch', 1: 'height', 2: 'width'},
+                    'logits': {0: 'batch'},
+                    'pred_boxes': {0: 'batch'},
+                },
+                opset_version=17,
+            )
+            tmp_path.replace(onnx_path)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = os.cpu_count() or 1
+        session = ort.InferenceSession(str(onnx_path), options, providers=['CPUExecutionProvider'])
+
+        logger.info(f"✓ DETR running on ONNX Runtime (CPU): {onnx_path.name}")
+        return _OnnxDetr(session, model.config)
+
+    except Exception as e:
+        logger.warning(f"ONNX Runtime DETR unavailable, using eager PyTorch on CPU: {e}")
+        return model
+
+
 def _load_openclip_model() -> None:
     """Load OpenCLIP model for semantic embeddings."""
     logger.info("Loading OpenCLIP model...")
     
     try:
+        import open_clip
+        
         device = _models_cache['device']
         
         model, _, preprocess = open_clip.create_model_and_transforms(
@@ -88,15 +188,22 @@ def _load_openclip_model() -> None:
             device=device
         )
         
-        model.eval()
+        # Inference only: no autograd bookkeeping for the weights
+        model.eval().requires_grad_(False)
         
         # Enable mixed precision
         if device == 'cuda':
             model = model.half()
+            if settings.OPENCLIP_TENSORRT:
+                model.visual = _compile_visual_tensorrt(model.visual)
+        
+        tokenizer = open_clip.get_tokenizer(settings.OPENCLIP_MODEL_NAME)
+        if settings.OPENCLIP_COMPILE_TEXT:
+            _compile_text_encoder(model, tokenizer)
         
         _models_cache['clip_model'] = model
         _models_cache['clip_preprocess'] = preprocess
-        _models_cache['clip_tokenizer'] = open_clip.get_tokenizer(settings.OPENCLIP_MODEL_NAME)
+        _models_cache['clip_tokenizer'] = tokenizer
         
         logger.info("✓ OpenCLIP model loaded")
         
@@ -105,11 +212,87 @@ def _load_openclip_model() -> None:
         raise
 
 
+def _compile_visual_tensorrt(visual: "torch.nn.Module") -> "torch.nn.Module":
+    """
+    Compile the OpenCLIP visual tower to an FP16 TensorRT engine.
+
+    The compiled module is cached in MODEL_CACHE_DIR keyed by model and input
+    shape, so only the first start pays the build cost. Returns the eager
+    module unchanged if torch_tensorrt is unavailable or compilation fails.
+    """
+    try:
+        import torch
+        import torch_tensorrt
+    except ImportError:
+        logger.warning("torch_tensorrt not installed, using eager OpenCLIP visual tower")
+        return visual
+
+    image_size = settings.OPENCLIP_IMAGE_SIZE
+    max_batch = settings.OPENCLIP_TENSORRT_MAX_BATCH
+    engine_path = Path(settings.MODEL_CACHE_DIR) / (
+        f"{settings.OPENCLIP_MODEL_NAME}_{settings.OPENCLIP_PRETRAINED}"
+        f"_visual_fp16_b{max_batch}_{image_size}.ts"
+    )
+
+    try:
+        if engine_path.exists():
+            compiled = torch.jit.load(str(engine_path)).cuda()
+            logger.info(f"✓ Loaded TensorRT visual engine: {engine_path.name}")
+            return compiled
+
+        logger.info("Compiling OpenCLIP visual tower with TensorRT (first run only)...")
+        compiled = torch_tensorrt.compile(
+            visual,
+            ir="ts",
+            inputs=[torch_tensorrt.Input(
+                min_shape=(1, 3, image_size, image_size),
+                opt_shape=(1, 3, image_size, image_size),
+                max_shape=(max_batch, 3, image_size, image_size),
+                dtype=torch.half,
+            )],
+            enabled_precisions={torch.half},
+        )
+        torch.jit.save(compiled, str(engine_path))
+        logger.info(f"✓ TensorRT visual engine saved: {engine_path.name}")
+        return compiled
+
+    except Exception as e:
+        logger.warning(f"TensorRT compilation failed, using eager visual tower: {e}")
+        return visual
+
+
+def _compile_text_encoder(model: "torch.nn.Module", tokenizer) -> None:
+    """
+    Replace model.encode_text with a torch.compile'd version, in place.
+
+    The tokenizer always pads to the 77-token CLIP context, so a single query
+    has one static shape and compiles once. Compilation is lazy; it is forced
+    here with a dummy query so a broken toolchain falls back to eager at load
+    time rather than failing the first search.
+    """
+    import torch
+    
+    eager_encode_text = model.encode_text
+    try:
+        start = time.perf_counter()
+        compiled = torch.compile(eager_encode_text, dynamic=False)
+        tokens = tokenizer(["warmup"]).to(_models_cache['device'])
+        with torch.inference_mode():
+            compiled(tokens)
+        model.encode_text = compiled
+        logger.info(f"✓ OpenCLIP text encoder compiled in {time.perf_counter() - start:.1f}s")
+        
+    except Exception as e:
+        logger.warning(f"torch.compile failed, using eager OpenCLIP text encoder: {e}")
+
+
 def _load_paddleocr_model() -> None:
     """Load PaddleOCR model for text extraction."""
     logger.info("Loading PaddleOCR model...")
     
     try:
+        from paddleocr import PaddleOCR
+        
         # Note: ONNX Runtime doesn't support CUDA 13 yet, so PaddleOCR will
         # automatically fall back to CPU if CUDA is unavailable for ONNX
         lang_code = settings.OCR_LANG
@@ -132,7 +315,7 @@ def _load_insightface_model() -> None:
     logger.info("Loading InsightFace model...")
     
     try:
-        device = _models_cache['device']
+        import insightface
         
         # Force CPU mode - ONNX Runtime doesn't support CUDA 13 yet
         face_app = insightface.app.FaceAnalysis(
@@ -154,25 +337,150 @@ def _load_insightface_model() -> None:
         raise
 
 
+# Serializes model loading so concurrent first calls load each model once
+_models_lock = threading.Lock()
+
+
+def _ensure_loaded(ready_key: str, loader) -> None:
+    """Run a model loader once; ready_key is the last cache entry the loader sets."""
+    if _models_cache[ready_key] is not None:
+        return
+    
+    with _models_lock:
+        if _models_cache[ready_key] is not None:
+            return
+        if _models_cache['device'] is None:
+            _models_cache['device'] = settings.DEVICE
+        loader()
+        
+        # Loaders may run on a caller's side stream; make the weights visible to all streams
+        if _models_cache['device'] == 'cuda':
+            import torch
+            torch.cuda.synchronize()
+
+
+def get_detr() -> Tuple[Any, Any]:
+    """Return (processor, model) for DETR, loading it on first use."""
+    _ensure_loaded('detr_model', _load_detr_model)
+    return _models_cache['detr_processor'], _models_cache['detr_model']
+
+
+def get_clip() -> Tuple[Any, Any, Any]:
+    """Return (model, preprocess, tokenizer) for OpenCLIP, loading it on first use."""
+    _ensure_loaded('clip_tokenizer', _load_openclip_model)
+    return _models_cache['clip_model'], _models_cache['clip_preprocess'], _models_cache['clip_tokenizer']
+
+
+def get_ocr() -> Any:
+    """Return the PaddleOCR model, loading it on first use."""
+    _ensure_loaded('ocr_model', _load_paddleocr_model)
+    return _models_cache['ocr_model']
+
+
+def get_face_app() -> Any:
+    """Return the InsightFace analysis app, loading it on first use."""
+    _ensure_loaded('face_app', _load_insightface_model)
+    return _models_cache['face_app']
+
+
+def warmup_models() -> None:
+    """Run dummy DETR/OpenCLIP forward passes so first-call setup happens at load time."""
+    import torch
+    
+    logger.info("Warming up models...")
+    
+    _, detr_model = get_detr()
+    clip_model, _, clip_tokenizer = get_clip()
+    device = _models_cache['device']
+    image_size = settings.OPENCLIP_IMAGE_SIZE
+    
+    pixels = torch.zeros(1, 3, image_size, image_size, device=device)
+    clip_pixels = pixels.half() if device == 'cuda' else pixels
+    tokens = clip_tokenizer(["warmup"]).to(device)
+    
+    for pass_number in range(1, WARMUP_PASSES + 1):
+        start = time.perf_counter()
+        with torch.inference_mode():
+            detr_model(pixel_values=pixels)
+            clip_model.encode_image(clip_pixels)
+            clip_model.encode_text(tokens)
+        if device == 'cuda':
+            torch.cuda.synchronize()
+        logger.info(f"Warm-up pass {pass_number}: {time.perf_counter() - start:.2f}s")
+    
+    logger.info("✓ Models warmed up successfully")
+
+
 def initialize_models() -> None:
-    """Initialize all models (only once)."""
+    """Load and warm up all models (only once); used by workers at startup."""
     if _models_cache['initialized']:
         return
     
     logger.info("Initializing AI models...")
     logger.info(f"Device: {settings.DEVICE}")
     
-    _models_cache['device'] = settings.DEVICE
+    get_detr()
+    get_clip()
+    get_ocr()
+    get_face_app()
     
-    _load_detr_model()
-    _load_openclip_model()
-    _load_paddleocr_model()
-    _load_insightface_model()
+    try:
+        warmup_models()
+    except Exception as e:
+        logger.warning(f"Model warm-up pass failed: {e}")
     
     _models_cache['initialized'] = True
     logger.info("✓ All AI models loaded successfully")
 
 
+_thread_state = threading.local()
+
+
+def _on_thread_stream(func):
+    """
+    Run a GPU inference function on a CUDA stream owned by the calling thread.
+
+    Lets DETR and OpenCLIP calls from different worker threads overlap on the
+    GPU instead of serializing on the default stream. Wrapped functions must
+    return host data (lists / numpy), which forces their GPU work to finish.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if settings.DEVICE != 'cuda':
+            return func(*args, **kwargs)
+
+        import torch
+
+        stream = getattr(_thread_state, 'stream', None)
+        if stream is None:
+            stream = _thread_state.stream = torch.cuda.Stream()
+
+        # Order after anything already queued on the default stream (e.g. weight uploads)
+        stream.wait_stream(torch.cuda.default_stream())
+        with torch.cuda.stream(stream):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def _format_detections(results: Dict, id2label: Dict[int, str]) -> List[Dict]:
+    """Convert DETR post-processed results into tag/confidence/bbox dicts."""
+    detections = []
+    for score, label, box in zip(results["scores"].tolist(), results["labels"].tolist(), results["boxes"].tolist()):
+        detections.append({
+            'tag': id2label[label],
+            'confidence': score,
+            'bbox': {
+                'x1': box[0],
+                'y1': box[1],
+                'x2': box[2],
+                'y2': box[3]
+            }
+        })
+    return detections
+
+
+@_on_thread_stream
 def recognize_objects_detr(image: Image.Image, confidence_threshold: float = 0.5) -> List[Dict[str, float]]:
     """
     Recognize objects in an image using DETR.
@@ -184,16 +492,12 @@ def recognize_objects_detr(image: Image.Image, confidence_threshold: float = 0.5
     Returns:
         List of dicts with 'tag', 'confidence', and 'bbox' keys
     """
-    if not _models_cache['initialized']:
-        initialize_models()
+    import torch
+    
+    processor, model = get_detr()
+    device = _models_cache['device']
     
     try:
-        import torch
-        
-        processor = _models_cache['detr_processor']
-        model = _models_cache['detr_model']
-        device = _models_cache['device']
-        
         # Prepare image
         inputs = processor(images=image, return_tensors="pt")
         
@@ -202,7 +506,7 @@ def recognize_objects_detr(image: Image.Image, confidence_threshold: float = 0.5
             inputs = {k: v.cuda() for k, v in inputs.items()}
         
         # Run inference
-        with torch.no_grad():
+        with torch.inference_mode():
             outputs = model(**inputs)
         
         # Post-process results
@@ -217,22 +521,7 @@ def recognize_objects_detr(image: Image.Image, confidence_threshold: float = 0.5
         )[0]
         
         # Convert to our format
-        detections = []
-        for score, label, box in zip(results["scores"], results["labels"], results["boxes"]):
-            label_name = model.config.id2label[label.item()]
-            confidence = score.item()
-            bbox = box.tolist()
-            
-            detections.append({
-                'tag': label_name,
-                'confidence': confidence,
-                'bbox': {
-                    'x1': bbox[0],
-                    'y1': bbox[1],
-                    'x2': bbox[2],
-                    'y2': bbox[3]
-                }
-            })
+        detections = _format_detections(results, model.config.id2label)
         
         logger.debug(f"DETR detected {len(detections)} objects")
         return detections
@@ -256,6 +545,55 @@ def recognize_objects(image: Image.Image, confidence_threshold: float = 0.5) ->
     return recognize_objects_detr(image, confidence_threshold)
 
 
+@_on_thread_stream
+def recognize_objects_batch(images: List[Image.Image], confidence_threshold: float = 0.5) -> List[List[Dict]]:
+    """
+    Recognize objects in several images with a single DETR forward pass.
+    
+    Args:
+        images: List of PIL Images
+        confidence_threshold: Minimum confidence score (0-1)
+        
+    Returns:
+        One detection list per input image, in the same order
+    """
+    if not images:
+        return []
+    
+    import torch
+    
+    processor, model = get_detr()
+    device = _models_cache['device']
+    
+    try:
+        # Images of different sizes are padded; pixel_mask marks the valid area
+        inputs = processor(images=images, return_tensors="pt")
+        
+        if device == 'cuda':
+            inputs = {k: v.cuda() for k, v in inputs.items()}
+        
+        with torch.inference_mode():
+            outputs = model(**inputs)
+        
+        target_sizes = torch.tensor([image.size[::-1] for image in images])
+        if device == 'cuda':
+            target_sizes = target_sizes.cuda()
+        
+        results = processor.post_process_object_detection(
+            outputs,
+            target_sizes=target_sizes,
+            threshold=confidence_threshold
+        )
+        
+        id2label = model.config.id2label
+        return [_format_detections(result, id2label) for result in results]
+        
+    except Exception as e:
+        logger.error(f"Error in batched DETR object recognition: {e}")
+        return [[] for _ in images]
+
+
+@_on_thread_stream
 def generate_image_embedding(image: Image.Image) -> np.ndarray:
     """
     Generate semantic embedding for an image using OpenCLIP.
@@ -266,14 +604,12 @@ def generate_image_embedding(image: Image.Image) -> np.ndarray:
     Returns:
         1024-dim numpy array
     """
-    if not _models_cache['initialized']:
-        initialize_models()
+    import torch
+    
+    clip_model, clip_preprocess, _ = get_clip()
+    device = _models_cache['device']
     
     try:
-        device = _models_cache['device']
-        clip_model = _models_cache['clip_model']
-        clip_preprocess = _models_cache['clip_preprocess']
-        
         # Preprocess image
         image_input = clip_preprocess(image).unsqueeze(0)
         
@@ -281,7 +617,7 @@ def generate_image_embedding(image: Image.Image) -> np.ndarray:
             image_input = image_input.cuda().half()
         
         # Generate embedding
-        with torch.no_grad():
+        with torch.inference_mode():
             image_features = clip_model.encode_image(image_input)
             image_features = image_features / image_features.norm(dim=-1, keepdim=True)
         
@@ -296,37 +632,96 @@ def generate_image_embedding(image: Image.Image) -> np.ndarray:
         return np.zeros(1024, dtype=np.float32)
 
 
-def generate_text_embedding(text: str) -> np.ndarray:
+@_on_thread_stream
+def generate_image_embeddings_batch(images: List[Image.Image]) -> np.ndarray:
     """
-    Generate semantic embedding for text using OpenCLIP.
+    Generate semantic embeddings for several images in one OpenCLIP forward pass.
     
     Args:
-        text: Text string
+        images: List of PIL Images
         
     Returns:
-        1024-dim numpy array
+        (len(images), 1024) float32 numpy array, rows in input order
     """
-    if not _models_cache['initialized']:
-        initialize_models()
+    if not images:
+        return np.zeros((0, 1024), dtype=np.float32)
+    
+    import torch
+    
+    clip_model, clip_preprocess, _ = get_clip()
+    device = _models_cache['device']
     
     try:
-        device = _models_cache['device']
-        clip_model = _models_cache['clip_model']
-        clip_tokenizer = _models_cache['clip_tokenizer']
-        
-        # Tokenize text
-        text_input = clip_tokenizer([text])
+        image_input = torch.stack([clip_preprocess(image) for image in images])
         
         if device == 'cuda':
-            text_input = text_input.cuda()
+            image_input = image_input.cuda().half()
         
-        # Generate embedding
-        with torch.no_grad():
-            text_features = clip_model.encode_text(text_input)
-            text_features = text_features / text_features.norm(dim=-1, keepdim=True)
+        with torch.inference_mode():
+            image_features = clip_model.encode_image(image_input)
+            image_features = image_features / image_features.norm(dim=-1, keepdim=True)
         
-        # Convert to numpy
-        embedding = text_features.cpu().numpy().astype(np.float32)[0]
+        return image_features.cpu().numpy().astype(np.float32)
+        
+    except Exception as e:
+        logger.error(f"Error generating batched image embeddings: {e}")
+        return np.zeros((len(images), 1024), dtype=np.float32)
+
+
+def _normalize_query(text: str) -> str:
+    """
+    Canonical cache key for a text query.
+
+    The OpenCLIP tokenizer lowercases and collapses whitespace itself, so
+    "Red  Car " and "red car" encode identically and can share a cache entry.
+    """
+    return " ".join(str(text).split()).lower()
+
+
+@lru_cache(maxsize=TEXT_EMBEDDING_CACHE_SIZE)
+@_on_thread_stream
+def _encode_text_cached(text: str) -> bytes:
+    """
+    Encode text with OpenCLIP; results are cached as raw FP16 bytes.
+
+    Stored embeddings are halfvec, so the query loses nothing by matching their precision.
+    """
+    import torch
+    
+    clip_model, _, clip_tokenizer = get_clip()
+    device = _models_cache['device']
+    
+    # Tokenize text
+    text_input = clip_tokenizer([text])
+    
+    if device == 'cuda':
+        text_input = text_input.cuda()
+    
+    # Generate embedding
+    with torch.inference_mode():
+        text_features = clip_model.encode_text(text_input)
+        text_features = text_features / text_features.norm(dim=-1, keepdim=True)
+    
+    return text_features.cpu().numpy().astype(np.float16)[0].tobytes()
+
+
+def generate_text_embedding(text: str) -> np.ndarray:
+    """
+    Generate semantic embedding for text using OpenCLIP.
+    
+    Repeated queries are served from an in-process LRU cache.
+    
+    Args:
+        text: Text string
+        
+    Returns:
+        1024-dim numpy array
+    """
+    get_clip()
+    
+    try:
+        # Failures raise out of the cached function, so they are never cached
+        embedding = np.frombuffer(_encode_text_cached(_normalize_query(text)), dtype=np.float16).astype(np.float32)
         
         logger.debug(f"Generated text embedding: shape {embedding.shape}")
         return embedding
@@ -346,11 +741,9 @@ def extract_text(image_path: str) -> Optional[str]:
     Returns:
         Extracted text or None if no text found
     """
-    if not _models_cache['initialized']:
-        initialize_models()
+    ocr_model = get_ocr()
     
     try:
-        ocr_model = _models_cache['ocr_model']
         result = ocr_model.ocr(image_path)
         
         if not result or not result[0]:
@@ -384,8 +777,9 @@ def detect_faces(image_path: str) -> List[Dict]:
     Returns:
         List of face dicts with 'bbox' and 'embedding' keys
     """
-    if not _models_cache['initialized']:
-        initialize_models()
+    import cv2
+    
+    face_app = get_face_app()
     
     # Early return for invalid image
     img = cv2.imread(image_path)
@@ -394,7 +788,6 @@ def detect_faces(image_path: str) -> List[Dict]:
         return []
     
     try:
-        face_app = _models_cache['face_app']
         faces = face_app.get(img)
         
         if not faces:
@@ -434,6 +827,9 @@ def calculate_pdq_hash(image_path: str) -> Tuple[str, Optional[float]]:
     Returns:
         Tuple of (hash_hex_string, quality_score)
     """
+    import cv2
+    import pdqhash
+    
     # Early return for invalid image
     img = cv2.imread(image_path)
     if img is None:
@@ -447,15 +843,9 @@ def calculate_pdq_hash(image_path: str) -> Tuple[str, Optional[float]]:
         # Calculate PDQ hash
         hash_vector, quality = pdqhash.compute(img_rgb)
         
-        # Convert bit vector to hex string
-        # pdqhash returns a numpy array of 256 bits (0s and 1s)
-        # Convert to hex: group 8 bits into bytes, then convert to hex
-        hash_bytes = bytearray()
-        for i in range(0, len(hash_vector), 8):
-            byte_bits = hash_vector[i:i+8]
-            byte_val = int(''.join(str(int(b)) for b in byte_bits), 2)
-            hash_bytes.append(byte_val)
-        hash_hex = hash_bytes.hex()
+        # pdqhash returns a numpy array of 256 bits (0s and 1s);
+        # pack MSB-first into 32 bytes, then convert to hex
+        hash_hex = np.packbits(hash_vector.astype(np.uint8)).tobytes().hex()
         
         logger.debug(f"PDQ hash: {hash_hex[:16]}... (quality: {quality})")
         return (hash_hex, float(quality) if quality is not None else None)
@@ -463,27 +853,3 @@ def calculate_pdq_hash(image_path: str) -> Tuple[str, Optional[float]]:
     except Exception as e:
         logger.error(f"Error calculating PDQ hash: {e}")
         return ("", None)
-
-
-def warmup_models() -> None:
-    """Warmup models with dummy data to initialize CUDA."""
-    logger.info("Warming up models...")
-    
-    # Ensure models are initialized
-    initialize_models()
-    
-    # Create dummy image
-    dummy_img = Image.new('RGB', (224, 224), color='white')
-    
-    try:
-        # Warmup RAM++
-        _ = recognize_objects(dummy_img)
-        
-        # Warmup OpenCLIP
-        _ = generate_image_embedding(dummy_img)
-        _ = generate_text_embedding("test")
-        
-        logger.info("✓ Models warmed up successfully")
-        
-    except Exception as e:
-        logger.warning(f"Model warmup encountered errors: {e}")
@@ -2,9 +2,14 @@
 Celery application configuration.
 """
 
+import logging
+
 from celery import Celery
+from celery.signals import worker_init
 from config import settings
 
+logger = logging.getLogger(__name__)
+
 # Create Celery app
 app = Celery(
     'ai_photos_worker',
@@ -33,6 +38,29 @@ app.conf.update(
     worker_task_log_format='[%(asctime)s: %(levelname)s/%(processName)s] [%(task_name)s(%(task_id)s)] %(message)s'
 )
 
+
+@worker_init.connect
+def preload_shared_models(**kwargs):
+    """
+    Load OpenCLIP in the parent process before the pool forks.
+
+    Forked workers then share the multi-GB weights through copy-on-write
+    pages, and workers replaced by worker_max_tasks_per_child start without
+    reloading them. CUDA cannot be initialized before fork, and the
+    ONNX Runtime backed models are not fork-safe, so only the CPU torch
+    model is preloaded.
+    """
+    if not settings.CELERY_PRELOAD_MODELS:
+        return
+    if settings.DEVICE == 'cuda':
+        logger.warning("CELERY_PRELOAD_MODELS ignored: CUDA models cannot be shared across fork")
+        return
+    
+    from workers import ai_models
+    ai_models.get_clip()
+    logger.info("OpenCLIP preloaded for forked workers")
+
+
 if __name__ == '__main__':
     app.start()
 
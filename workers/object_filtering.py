@@ -1,5 +1,7 @@
 """Helper utilities for filtering noisy object detections before persistence."""
 
+from itertools import groupby
+from operator import itemgetter
 from typing import Dict, List, Optional, Tuple
 
 from config import settings
@@ -95,7 +97,19 @@ def filter_detected_objects(
     return filtered_objects, filtered_out_count
 
 
+def deduplicate_tags(detected_objects: List[Dict]) -> Dict[str, Dict]:
+    """
+    Keep the highest-confidence detection per tag.
+
+    Sorting by (tag, -confidence) puts each tag's best detection first; the sort
+    is stable, so ties keep the earliest detection.
+    """
+    ordered = sorted(detected_objects, key=lambda obj: (obj['tag'], -obj['confidence']))
+    return {tag: next(group) for tag, group in groupby(ordered, key=itemgetter('tag'))}
+
+
 __all__ = [
     "compute_area_ratio",
     "filter_detected_objects",
+    "deduplicate_tags",
 ]
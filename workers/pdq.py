@@ -0,0 +1,40 @@
+"""Helpers for comparing PDQ perceptual hashes stored as raw bytes."""
+
+from typing import Sequence
+
+import numpy as np
+
+PDQ_HASH_BYTES = 32
+PDQ_HASH_WORDS = PDQ_HASH_BYTES // 8
+# Reference PDQ near-duplicate threshold, in differing bits out of 256
+PDQ_MATCH_THRESHOLD = 31
+
+
+def hamming_distance(hash_a: bytes, hash_b: bytes) -> int:
+    """Count differing bits between two PDQ hashes (0-256 for 32-byte hashes)."""
+    if len(hash_a) != len(hash_b):
+        raise ValueError(f"PDQ hash length mismatch: {len(hash_a)} != {len(hash_b)}")
+
+    diff = int.from_bytes(hash_a, "big") ^ int.from_bytes(hash_b, "big")
+    return diff.bit_count()
+
+
+def is_duplicate(distance: int, threshold: int = PDQ_MATCH_THRESHOLD) -> bool:
+    """Whether a bit-level Hamming distance is close enough to flag a duplicate."""
+    return distance <= threshold
+
+
+def pack_hashes(hashes: Sequence[bytes]) -> np.ndarray:
+    """Pack 32-byte PDQ hashes into an (N, 4) uint64 array for vectorized comparison."""
+    for value in hashes:
+        if len(value) != PDQ_HASH_BYTES:
+            raise ValueError(f"PDQ hash must be {PDQ_HASH_BYTES} bytes, got {len(value)}")
+
+    buffer = b"".join(hashes)
+    return np.frombuffer(buffer, dtype=np.uint64).reshape(len(hashes), PDQ_HASH_WORDS)
+
+
+def hamming_distances(query: bytes, packed: np.ndarray) -> np.ndarray:
+    """Hamming distance from one PDQ hash to every row of a pack_hashes() array."""
+    diff = np.bitwise_xor(packed, pack_hashes([query]))
+    return np.bitwise_count(diff).sum(axis=1, dtype=np.int32)
@@ -8,7 +8,7 @@ from pathlib import Path
 from typing import Optional
 
 from celery import Task
-from sqlalchemy import text
+from sqlalchemy import func, text
 from workers.celery_app import app
 from workers import ai_models
 from models import (
@@ -18,7 +18,8 @@ from models import (
 )
 from utils import process_image_for_storage, ImageConversionError
 from config import settings
-from workers.object_filtering import filter_detected_objects
+from workers.object_filtering import deduplicate_tags, filter_detected_objects
+from workers.pdq import PDQ_HASH_BYTES, hamming_distances, is_duplicate, pack_hashes
 
 logger = logging.getLogger(__name__)
 
@@ -106,7 +107,7 @@ def _process_ocr(session, photo: Photo, image_path: str, results: dict) -> None:
         results.setdefault('steps_completed', []).append('ocr')
 
 
-@app.task(base=PhotoProcessingTask, bind=True, name='process_single_image')
+@app.task(base=PhotoProcessingTask, bind=True, name='process_single_image', ignore_result=True)
 def process_single_image(self, photo_id: int):
     """
     Process a single image through the complete AI pipeline.
@@ -181,11 +182,7 @@ def process_single_image(self, photo_id: int):
                 )
 
             # Deduplicate tags for PhotoTag (keep highest confidence per tag)
-            unique_tags = {}
-            for obj in filtered_objects:
-                tag = obj['tag']
-                if tag not in unique_tags or obj['confidence'] > unique_tags[tag]['confidence']:
-                    unique_tags[tag] = obj
+            unique_tags = deduplicate_tags(filtered_objects)
 
             # Find category for tags (do this once for all tags)
             tag_category_map = {}
@@ -203,15 +200,19 @@ def process_single_image(self, photo_id: int):
                 )
                 session.add(photo_tag)
 
-            # Save all instances to DetectedObject (with bbox)
+            # Save all instances to DetectedObject (with bbox corners)
             for obj in filtered_objects:
                 tag = obj['tag']
+                bbox = obj.get('bbox') or {}  # DETR already returns this
                 detected_obj = DetectedObject(
                     photo_id=photo_id,
                     tag=tag,
                     confidence=obj['confidence'],
                     category_id=tag_category_map.get(tag),
-                    bbox=obj.get('bbox')  # DETR already returns this
+                    x1=bbox.get('x1'),
+                    y1=bbox.get('y1'),
+                    x2=bbox.get('x2'),
+                    y2=bbox.get('y2')
                 )
                 session.add(detected_obj)
 
@@ -242,7 +243,7 @@ def process_single_image(self, photo_id: int):
             # Store embedding
             semantic_emb = SemanticEmbedding(
                 photo_id=photo_id,
-                embedding=embedding.tolist(),
+                embedding=embedding,  # HALFVEC binds numpy arrays directly
                 model_version="ViT-H-14/laion2b_s32b_b79k"
             )
             session.add(semantic_emb)
@@ -272,10 +273,14 @@ def process_single_image(self, photo_id: int):
             faces = ai_models.detect_faces(image_path)
             
             for face_data in faces:
+                bbox = face_data['bbox']
                 face = Face(
                     photo_id=photo_id,
-                    bbox=face_data['bbox'],
-                    embedding=face_data['embedding'].tolist(),
+                    x=bbox['x'],
+                    y=bbox['y'],
+                    width=bbox['width'],
+                    height=bbox['height'],
+                    embedding=face_data['embedding'],
                     cluster_id=None  # Clustering will be done later
                 )
                 session.add(face)
@@ -298,7 +303,7 @@ def process_single_image(self, photo_id: int):
             if hash_hex:
                 photo_hash = PhotoHash(
                     photo_id=photo_id,
-                    pdq_hash=hash_hex,
+                    pdq_hash=bytes.fromhex(hash_hex),
                     quality_score=quality
                 )
                 session.add(photo_hash)
@@ -319,18 +324,23 @@ def process_single_image(self, photo_id: int):
             current_hash = session.query(PhotoHash).filter_by(photo_id=photo_id).first()
             
             if current_hash:
-                # Find similar hashes using Hamming distance
-                # Note: This is a simple implementation; for production, use specialized index
-                other_hashes = session.query(PhotoHash).filter(
-                    PhotoHash.photo_id != photo_id
+                # Compare against every other hash in one vectorized pass
+                # Note: This is a linear scan; for production, use specialized index
+                other_hashes = session.query(PhotoHash.photo_id, PhotoHash.pdq_hash).filter(
+                    PhotoHash.photo_id != photo_id,
+                    func.length(PhotoHash.pdq_hash) == PDQ_HASH_BYTES
                 ).all()
                 
+                distances = hamming_distances(
+                    current_hash.pdq_hash,
+                    pack_hashes([other_hash.pdq_hash for other_hash in other_hashes])
+                ) if other_hashes else []
+                
                 duplicates_found = 0
-                for other_hash in other_hashes:
-                    # Calculate Hamming distance
-                    distance = sum(c1 != c2 for c1, c2 in zip(current_hash.pdq_hash, other_hash.pdq_hash))
+                for other_hash, distance in zip(other_hashes, distances):
+                    distance = int(distance)
                     
-                    if distance <= settings.DUPLICATE_THRESHOLD:
+                    if is_duplicate(distance, settings.DUPLICATE_THRESHOLD):
                         # Check if duplicate relationship already exists
                         existing = session.query(Duplicate).filter(
                             ((Duplicate.photo_id_1 == photo_id) & (Duplicate.photo_id_2 == other_hash.photo_id)) |